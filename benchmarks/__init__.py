@@ -0,0 +1,7 @@
+"""
+Benchmarks for django-model-changes.
+
+Each module is a standalone script, e.g. ``python -m benchmarks.field_plan``.
+``python -m benchmarks.suite`` runs the full suite and reports the results as
+JSON.
+"""
@@ -0,0 +1,48 @@
+"""
+Micro-benchmark for ``current_state()``.
+
+Compares taking a snapshot with the cached per-model field plan against
+rebuilding the set of field names on every call, which is what
+``current_state()`` did before the plan was introduced.
+
+Run with ``python -m benchmarks.field_plan``.
+"""
+
+import os
+import timeit
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+django.setup()
+
+# Models can only be imported once Django is set up.
+from .models import Narrow, Wide
+
+NUMBER = 20_000
+
+
+def rebuild_field_names(instance):
+    field_names = set()
+    for f in instance._meta.local_fields:
+        field_names.add(f.name)
+        field_names.add(f.attname)
+    return {field_name: getattr(instance, field_name) for field_name in field_names}
+
+
+def main():
+    for model in (Narrow, Wide):
+        instance = model()
+        fields = len(model._meta.local_fields)
+        rebuilt = min(timeit.repeat(lambda: rebuild_field_names(instance), number=NUMBER))
+        planned = min(timeit.repeat(instance.current_state, number=NUMBER))
+        print(
+            f"{model.__name__} ({fields} fields): "
+            f"rebuilt {rebuilt / NUMBER * 1e6:.2f} us/call, "
+            f"field plan {planned / NUMBER * 1e6:.2f} us/call, "
+            f"saving {(1 - planned / rebuilt) * 100:.0f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Memory benchmark for recorded states.
+
+Measures with ``tracemalloc`` the memory taken by the states recorded for
+many instances, as compact ``State`` objects and as the ``field -> value``
+dicts that were recorded before ``State`` was introduced.
+
+Run with ``python -m benchmarks.memory``.
+"""
+
+import os
+import tracemalloc
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+django.setup()
+
+# Models can only be imported once Django is set up.
+from .models import Narrow, Wide
+
+INSTANCES = 10_000
+
+
+def measure(take_state, instances):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    states = [take_state(instance) for instance in instances]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del states
+    return (after - before) / len(instances)
+
+
+def main():
+    for model in (Narrow, Wide):
+        instances = [model() for _ in range(INSTANCES)]
+        fields = len(model._meta.local_fields)
+        as_dict = measure(lambda instance: instance.current_state(), instances)
+        as_state = measure(lambda instance: instance._snapshot(), instances)
+        print(
+            f"{model.__name__} ({fields} fields): "
+            f"dict {as_dict:.0f} B/state, "
+            f"State {as_state:.0f} B/state, "
+            f"saving {(1 - as_state / as_dict) * 100:.0f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
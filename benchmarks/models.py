@@ -0,0 +1,63 @@
+from django.db import models
+
+from django_model_changes import ChangesMixin
+
+WIDE_FIELD_COUNT = 60
+FOREIGN_KEY_COUNT = 5
+
+
+class Narrow(ChangesMixin, models.Model):
+    name = models.CharField(max_length=100)
+    value = models.IntegerField(default=0)
+
+
+class PlainNarrow(models.Model):
+    name = models.CharField(max_length=100)
+    value = models.IntegerField(default=0)
+
+
+def _wide_fields():
+    return {f"field_{i}": models.IntegerField(default=i) for i in range(WIDE_FIELD_COUNT)}
+
+
+Wide = type("Wide", (ChangesMixin, models.Model), {"__module__": __name__, **_wide_fields()})
+
+PlainWide = type("PlainWide", (models.Model,), {"__module__": __name__, **_wide_fields()})
+
+
+class Parent(models.Model):
+    name = models.CharField(max_length=100)
+
+
+def _foreign_keys(model_name):
+    return {
+        f"parent_{i}": models.ForeignKey(
+            Parent, on_delete=models.CASCADE, related_name=f"{model_name}_{i}"
+        )
+        for i in range(FOREIGN_KEY_COUNT)
+    }
+
+
+# Snapshots read the related object of each ForeignKey.
+ForeignKeys = type(
+    "ForeignKeys",
+    (ChangesMixin, models.Model),
+    {"__module__": __name__, **_foreign_keys("foreign_keys")},
+)
+
+# Snapshots only record the column value of each ForeignKey.
+ForeignKeyColumns = type(
+    "ForeignKeyColumns",
+    (ChangesMixin, models.Model),
+    {
+        "__module__": __name__,
+        "track_related_objects": False,
+        **_foreign_keys("foreign_key_columns"),
+    },
+)
+
+PlainForeignKeys = type(
+    "PlainForeignKeys",
+    (models.Model,),
+    {"__module__": __name__, **_foreign_keys("plain_foreign_keys")},
+)
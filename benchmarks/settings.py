@@ -0,0 +1,18 @@
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": ":memory:",
+    }
+}
+
+INSTALLED_APPS = [
+    "benchmarks",
+]
+
+DEBUG = False
+
+SECRET_KEY = "benchmark-secret-key-not-for-production"
+
+DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+USE_TZ = True
@@ -0,0 +1,238 @@
+"""
+Benchmark suite for the overhead of ``ChangesMixin`` over a plain
+``models.Model``, on an in-memory SQLite database.
+
+Covers queryset iteration, ``changes()`` on narrow and wide models,
+``save()`` and ``delete()``, models with many foreign keys and memory per
+instance. Each ``ChangesMixin`` result is reported next to the same
+operation on a plain model.
+
+Results are written as JSON, and can be compared with the results of another
+commit::
+
+    python -m benchmarks.suite --output before.json
+    git checkout other-branch
+    python -m benchmarks.suite --output after.json --compare before.json
+
+Run ``python -m benchmarks.suite --help`` for all options.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import timeit
+import tracemalloc
+from datetime import UTC, datetime
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+django.setup()
+
+from django.apps import apps
+from django.db import connection, transaction
+
+# Models can only be imported once Django is set up.
+from .models import (
+    FOREIGN_KEY_COUNT,
+    ForeignKeyColumns,
+    ForeignKeys,
+    Narrow,
+    Parent,
+    PlainForeignKeys,
+    PlainNarrow,
+    PlainWide,
+    Wide,
+)
+
+REPEAT = 5
+CHANGES_NUMBER = 20_000
+SAVE_ROWS = 1_000
+FOREIGN_KEY_ROWS = 1_000
+MEMORY_ROWS = 10_000
+
+# ChangesMixin model -> plain model its overhead is measured against
+PLAIN_MODELS = {
+    "Narrow": "PlainNarrow",
+    "Wide": "PlainWide",
+    "ForeignKeys": "PlainForeignKeys",
+    "ForeignKeyColumns": "PlainForeignKeys",
+}
+
+
+def best(function, number=1):
+    """
+    Returns the best time per call of ``REPEAT`` runs of ``number`` calls.
+    """
+    return min(timeit.repeat(function, number=number, repeat=REPEAT)) / number
+
+
+def create_tables():
+    with connection.schema_editor() as editor:
+        for model in apps.get_app_config("benchmarks").get_models():
+            editor.create_model(model)
+
+
+def fill(model, rows, **values):
+    with transaction.atomic():
+        model._default_manager.all().delete()
+        model._default_manager.bulk_create((model(**values) for _ in range(rows)), batch_size=1_000)
+
+
+def bench_iteration(rows):
+    results = {}
+    for model in (Narrow, PlainNarrow, Wide, PlainWide):
+        fill(model, rows)
+        results[f"iterate_{rows}/{model.__name__}"] = best(
+            lambda: list(model._default_manager.all())
+        )
+    return results
+
+
+def bench_changes():
+    results = {}
+    for model in (Narrow, Wide):
+        instance = model()
+        instance.pk = 1
+        results[f"changes/{model.__name__}"] = best(instance.changes, CHANGES_NUMBER)
+    return results
+
+
+def bench_save_delete():
+    results = {}
+    for model in (Narrow, PlainNarrow):
+        fill(model, SAVE_ROWS)
+        instances = list(model._default_manager.all())
+
+        def save():
+            for instance in instances:
+                instance.value += 1
+                instance.save()
+
+        results[f"save/{model.__name__}"] = best(save) / SAVE_ROWS
+
+        timings = []
+        for _ in range(REPEAT):
+            fill(model, SAVE_ROWS)
+            instances = list(model._default_manager.all())
+            start = time.perf_counter()
+            for instance in instances:
+                instance.delete()
+            timings.append(time.perf_counter() - start)
+        results[f"delete/{model.__name__}"] = min(timings) / SAVE_ROWS
+    return results
+
+
+def bench_foreign_keys():
+    results = {}
+    parent = Parent._default_manager.create(name="parent")
+    values = {f"parent_{i}": parent for i in range(FOREIGN_KEY_COUNT)}
+    for model in (ForeignKeys, ForeignKeyColumns, PlainForeignKeys):
+        fill(model, FOREIGN_KEY_ROWS, **values)
+        name = f"iterate_{FOREIGN_KEY_ROWS}/{model.__name__}"
+        results[name] = best(lambda: list(model._default_manager.all()))
+    return results
+
+
+def bench_memory():
+    results = {}
+    for model in (Narrow, PlainNarrow, Wide, PlainWide):
+        fill(model, MEMORY_ROWS)
+        tracemalloc.start()
+        instances = list(model._default_manager.all())
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del instances
+        results[f"memory/{model.__name__}"] = size / MEMORY_ROWS
+    return results
+
+
+def metadata():
+    try:
+        git = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True)
+    except OSError:
+        commit = None
+    else:
+        commit = git.stdout.strip() or None
+    return {
+        "commit": commit,
+        "date": datetime.now(UTC).isoformat(),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "platform": platform.platform(),
+    }
+
+
+def overhead(results):
+    """
+    Returns the ratio of each ``ChangesMixin`` result to the same operation
+    on the plain model, e.g. ``{"iterate_1000/Narrow": 1.4}``.
+    """
+    ratios = {}
+    for name, value in results.items():
+        group, model = name.split("/")
+        plain = results.get(f"{group}/{PLAIN_MODELS.get(model)}")
+        if plain:
+            ratios[name] = value / plain
+    return ratios
+
+
+def compare(results, baseline):
+    """
+    Prints the ratio of each result to the same result of a baseline run.
+    """
+    print(f"{'benchmark':<40} {'baseline':>12} {'current':>12} {'ratio':>7}", file=sys.stderr)
+    for name, value in results.items():
+        before = baseline.get(name)
+        if before:
+            print(
+                f"{name:<40} {before:>12.4g} {value:>12.4g} {value / before:>7.2f}", file=sys.stderr
+            )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the overhead of ChangesMixin.")
+    parser.add_argument(
+        "--rows",
+        type=int,
+        nargs="+",
+        default=[1_000, 100_000],
+        help="row counts of the iteration benchmarks (default: 1000 100000)",
+    )
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    parser.add_argument("--compare", help="JSON results of a previous run to compare with")
+    args = parser.parse_args(argv)
+
+    create_tables()
+    results = {}
+    for rows in args.rows:
+        results.update(bench_iteration(rows))
+    results.update(bench_changes())
+    results.update(bench_save_delete())
+    results.update(bench_foreign_keys())
+    results.update(bench_memory())
+
+    report = {
+        "meta": metadata(),
+        # Seconds per operation, or bytes per instance for memory/.
+        "results": results,
+        "overhead": overhead(results),
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f)["results"])
+
+
+if __name__ == "__main__":
+    main()
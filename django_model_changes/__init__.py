@@ -1,5 +1,31 @@
-from .changes import ChangesMixin
-from .signals import post_change
+from .cache import CacheInvalidator
+from .changes import UNAVAILABLE, UNKNOWN, ChangesMixin, State
+from .comparators import Comparator, register_comparator
+from .context import suspend_tracking, untracked
+from .dispatch import ChangeEvent, ThreadedDispatcher
+from .managers import ChangesManager, ChangesQuerySet, changed_against_db
+from .payload import ChangePayload, register_encoder
+from .signals import post_change, post_change_bulk
 from ._version import __version__
 
-__all__ = ["ChangesMixin", "post_change", "__version__"]
+__all__ = [
+    "CacheInvalidator",
+    "ChangeEvent",
+    "ChangePayload",
+    "ChangesManager",
+    "ChangesMixin",
+    "ChangesQuerySet",
+    "Comparator",
+    "State",
+    "ThreadedDispatcher",
+    "UNAVAILABLE",
+    "UNKNOWN",
+    "changed_against_db",
+    "post_change",
+    "post_change_bulk",
+    "register_comparator",
+    "register_encoder",
+    "suspend_tracking",
+    "untracked",
+    "__version__",
+]
@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+
+
+class DjangoModelChangesConfig(AppConfig):
+    name = "django_model_changes"
+    verbose_name = "Model changes"
+    default_auto_field = "django.db.models.BigAutoField"
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping, Sequence
+from string import Formatter
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.db import models, transaction
+
+from .changes import UNKNOWN
+from .comparators import UNAVAILABLE, Digest
+from .dispatch import _on_commit_buffer
+from .signals import post_change, post_change_bulk
+
+if TYPE_CHECKING:
+    from django.db.backends.base.base import BaseDatabaseWrapper
+
+    from .changes import ChangesMixin
+
+
+class _Dependency(NamedTuple):
+    template: str
+    placeholders: frozenset[str]
+    # None if any change invalidates the key.
+    fields: frozenset[str] | None
+
+
+class CacheInvalidator:
+    """
+    Deletes cache keys of saved and deleted instances, but only those whose
+    dependent fields changed.
+
+    Keys are templates formatted with the values of the instance, e.g.
+    ``"user:{pk}"`` or ``"user:slug:{slug}"``. Fields used in a template are
+    dependencies of the key, and so are the ``fields`` it is registered with.
+    When a dependency changes, the key is formatted with both the values
+    before and after the change, so that entries cached under an old slug
+    are deleted too. Creating or deleting an instance invalidates all its
+    keys.
+
+    Keys are deleted with one ``delete_many()`` per transaction once it
+    commits, or right away outside of transactions.
+
+    Examples::
+
+        >>> invalidator = CacheInvalidator()
+        >>> invalidator.register(User, "user:{pk}", fields=["name", "email"])
+        >>> invalidator.register(User, "user:slug:{slug}", fields=())
+
+        >>> user.last_login = now()
+        >>> user.save()  # Nothing is invalidated
+        >>> user.slug = "new"
+        >>> user.save()  # Deletes user:1 and user:slug:old
+    """
+
+    def __init__(self, using: str = DEFAULT_CACHE_ALIAS) -> None:
+        self.using = using
+        self.dependencies: dict[type[models.Model], list[_Dependency]] = {}
+
+    def register(
+        self, model: type[models.Model], key: str, fields: Iterable[str] | None = None
+    ) -> None:
+        """
+        Invalidates ``key`` when one of ``fields`` of a ``model`` instance
+        changes, or when any field changes if ``fields`` is ``None``. Fields
+        can be given by name or attname. Pass ``fields=()`` for keys that only
+        depend on the fields used in the key.
+
+        Raises ``ValueError`` if the key uses a field that is not in the
+        states of the instances, e.g. an untracked field, a field in
+        ``digest_fields``, whose states only record a hash, or a related
+        object of a model with ``track_related_objects`` disabled.
+        """
+        placeholders = frozenset(
+            name for _, name, _, _ in Formatter().parse(key) if name is not None
+        )
+        plan = model._get_field_plan()  # type: ignore[attr-defined]
+        related = model.track_related_objects  # type: ignore[attr-defined]
+        names = plan.related_index if related else plan.index
+        missing = sorted(placeholders - names.keys() - {"pk"})
+        if missing:
+            raise ValueError(f"{key!r} uses fields that are not tracked: {', '.join(missing)}")
+        digests = sorted(
+            name for name in placeholders if plan.aliases.get(name, name) in plan.digest_attnames
+        )
+        if digests:
+            raise ValueError(f"{key!r} uses fields that only record digests: {', '.join(digests)}")
+        if fields is not None:
+            fields = placeholders.union(fields) - {"pk"}
+        self.dependencies.setdefault(model, []).append(_Dependency(key, placeholders, fields))
+        dispatch_uid = (id(self), model)
+        post_change.connect(self.receiver, sender=model, weak=False, dispatch_uid=dispatch_uid)
+        post_change_bulk.connect(
+            self.bulk_receiver, sender=model, weak=False, dispatch_uid=dispatch_uid
+        )
+
+    def unregister(self, model: type[models.Model]) -> None:
+        self.dependencies.pop(model, None)
+        post_change.disconnect(sender=model, dispatch_uid=(id(self), model))
+        post_change_bulk.disconnect(sender=model, dispatch_uid=(id(self), model))
+
+    def receiver(self, sender: type[models.Model], instance: ChangesMixin, **kwargs: Any) -> None:
+        changes = kwargs.get("changes")
+        if changes is None:
+            changes = instance.previous_changes()
+        self.invalidate(instance._state.db, self.keys(sender, instance, changes))
+
+    def bulk_receiver(
+        self,
+        sender: type[models.Model],
+        instances: Sequence[ChangesMixin],
+        changes: Sequence[dict[str, tuple[Any, Any]]],
+        **kwargs: Any,
+    ) -> None:
+        keys: set[str] = set()
+        for instance, instance_changes in zip(instances, changes):
+            keys |= self.keys(sender, instance, instance_changes)
+        if instances:
+            self.invalidate(instances[0]._state.db, keys)
+
+    def keys(
+        self,
+        sender: type[models.Model],
+        instance: ChangesMixin,
+        changes: Mapping[str, tuple[Any, Any]],
+    ) -> set[str]:
+        """
+        Returns the keys invalidated by the changes of an instance.
+        """
+        dependencies = self.dependencies.get(sender)
+        if not changes or not dependencies:
+            return set()
+        plan = type(instance)._get_field_plan()
+        changed = {plan.aliases.get(key, key) for key in changes}
+        pk_field = instance._meta.pk
+        pk_attname = pk_field.attname if pk_field is not None else "pk"
+        created_or_deleted = pk_attname in changed
+
+        current = instance.previous_state()
+        old = dict(current)
+        old.update((key, was) for key, (was, _) in changes.items())
+        keys: set[str] = set()
+        for dependency in dependencies:
+            if not (
+                created_or_deleted
+                or dependency.fields is None
+                or any(plan.aliases.get(name, name) in changed for name in dependency.fields)
+            ):
+                continue
+            for values in (old, current):
+                key = _format(dependency, values, pk_attname)
+                if key is not None:
+                    keys.add(key)
+        return keys
+
+    def invalidate(self, using: str | None, keys: set[str]) -> None:
+        """
+        Deletes the keys when the current transaction on database ``using``
+        commits, or right away outside of transactions.
+        """
+        if not keys:
+            return
+        connection = transaction.get_connection(using)
+        if connection.in_atomic_block:
+            _pending_keys(connection, self).update(keys)
+        else:
+            self.delete(keys)
+
+    def delete(self, keys: set[str]) -> None:
+        caches[self.using].delete_many(list(keys))
+
+
+def _format(dependency: _Dependency, values: Mapping[str, Any], pk_attname: str) -> str | None:
+    pk = values.get(pk_attname)
+    if pk is None:
+        # The instance doesn't exist in this state.
+        return None
+    fields = {"pk": pk}
+    for name in dependency.placeholders:
+        if name != "pk":
+            fields[name] = values[name]
+    if any(
+        value is UNKNOWN or value is UNAVAILABLE or isinstance(value, Digest)
+        for value in fields.values()
+    ):
+        return None
+    return dependency.template.format_map(fields)
+
+
+class _PendingKeys(set[str]):
+    """
+    Keys invalidated in a transaction, one set per invalidator and savepoint.
+    """
+
+    def __init__(self, invalidator: CacheInvalidator) -> None:
+        super().__init__()
+        self.invalidator = invalidator
+
+    def __call__(self) -> None:
+        if self:
+            self.invalidator.delete(set(self))
+
+
+def _pending_keys(connection: BaseDatabaseWrapper, invalidator: CacheInvalidator) -> _PendingKeys:
+    return _on_commit_buffer(
+        connection,
+        _PendingKeys,
+        lambda pending: pending.invalidator is invalidator,
+        lambda others: _PendingKeys(invalidator),
+    )
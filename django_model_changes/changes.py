@@ -1,11 +1,19 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator, Mapping, MutableSequence, Sequence
+from typing import TYPE_CHECKING, Any, NoReturn, Self
 
 from django.db import models
+from django.db.models import DEFERRED
+from django.db.models.base import ModelState
+from django.db.models.query_utils import DeferredAttribute
 from django.db.models import signals
 
-from .signals import post_change
+from .comparators import UNAVAILABLE, Comparator, Digest, DigestComparator, get_comparator
+from .context import INIT, SNAPSHOTS, suspended
+from .dispatch import asend_post_change, send_post_change
+from .instrumentation import _hooks, timed_diff, timed_snapshot
 
 if TYPE_CHECKING:
     from django.db.models.options import Options
@@ -13,8 +21,206 @@ if TYPE_CHECKING:
 SAVE = 0
 DELETE = 1
 
-# Track which classes have had signals connected
-_connected_classes: set[type] = set()
+
+class _Unknown:
+    def __repr__(self) -> str:
+        return "UNKNOWN"
+
+
+UNKNOWN: Any = _Unknown()
+"""
+Placeholder for the value of a deferred field (see ``QuerySet.defer()`` and
+``QuerySet.only()``) in a state. Fields with an unknown value on either side
+are never reported as changed.
+"""
+
+
+_digest_comparator = DigestComparator()
+
+
+class _Untracked:
+    """
+    Class attribute standing in for the tracking attributes of instances
+    created inside ``untracked()``, which have none.
+    """
+
+    def __get__(self, instance: Any, owner: type | None = None) -> Any:
+        if instance is None:
+            return self
+        raise AttributeError(
+            f"This {type(instance).__name__} instance was created inside untracked() "
+            "and has no states."
+        )
+
+
+class _FieldPlan:
+    """
+    The fields tracked for a model, computed once per model class.
+    """
+
+    def __init__(
+        self,
+        meta: Options,
+        tracked_fields: Sequence[str] | None = None,
+        untracked_fields: Sequence[str] = (),
+        digest_fields: Sequence[str] = (),
+    ) -> None:
+        # Kept to detect changes to the model's fields, Options replaces the
+        # tuple when its cache is expired. The fields of parent models are
+        # included, and of the concrete model for proxy models.
+        self.meta = meta
+        self.source = meta.concrete_fields
+        fields = self.source
+        if tracked_fields is not None:
+            tracked = {meta.get_field(name) for name in tracked_fields}
+            fields = tuple(f for f in fields if f in tracked or f.primary_key)
+        if untracked_fields:
+            untracked = {meta.get_field(name) for name in untracked_fields}
+            fields = tuple(f for f in fields if f not in untracked or f.primary_key)
+        self.untracked_attnames: tuple[str, ...] = tuple(
+            f.attname for f in self.source if f not in fields
+        )
+        # Values of fields with a plain DeferredAttribute are read straight
+        # from the instance dict, others go through their descriptor.
+        plain = [f for f in fields if f.descriptor_class.__get__ is DeferredAttribute.__get__]
+        described = [
+            f for f in fields if f.descriptor_class.__get__ is not DeferredAttribute.__get__
+        ]
+        self.plain_attnames: tuple[str, ...] = tuple(f.attname for f in plain)
+        self.descriptor_attnames: tuple[str, ...] = tuple(f.attname for f in described)
+        self.attnames = self.plain_attnames + self.descriptor_attnames
+        self.unknowns = (UNKNOWN,) * len(self.plain_attnames)
+        # Links to the parent rows of multi-table inheritance are tracked by
+        # attname only, the parent object is the instance itself.
+        self.aliases: dict[str, str] = {
+            f.name: f.attname
+            for f in fields
+            if f.name != f.attname and not (f.remote_field and f.remote_field.parent_link)
+        }
+        self.names = frozenset(self.attnames) | self.aliases.keys()
+        # Key -> database table of the field, which differs for the fields of
+        # parent models.
+        self.tables = {f.attname: f.model._meta.db_table for f in fields}
+        self.tables.update((name, self.tables[attname]) for name, attname in self.aliases.items())
+        self.related_names = {attname: name for name, attname in self.aliases.items()}
+        digested = {meta.get_field(name) for name in digest_fields}
+        comparators = {
+            f.attname: _digest_comparator if f in digested else get_comparator(f)
+            for f in plain + described
+        }
+        # Attnames of the fields whose states only record a Digest.
+        self.digest_attnames = frozenset(
+            attname
+            for attname, comparator in comparators.items()
+            if comparator is _digest_comparator
+        )
+        # Attname -> comparison of values not compared with ==.
+        self.comparators = {
+            attname: comparator.equal
+            for attname, comparator in comparators.items()
+            if comparator is not None and type(comparator).equal is not Comparator.equal
+        }
+        # Positions and copy functions of values that can be changed in place,
+        # without assigning the field.
+        self.copies = tuple(
+            (i, comparator.copy)
+            for i, comparator in enumerate(comparators.values())
+            if comparator is not None and comparator.copies
+        )
+        self.mutable_attnames = frozenset(self.attnames[i] for i, _ in self.copies)
+        # Key -> position of the value in a State, without and with the
+        # related objects stored under the names of their fields.
+        self.index = {attname: i for i, attname in enumerate(self.attnames)}
+        self.related_index = {key: i for i, key in enumerate(self.attnames + tuple(self.aliases))}
+        # Positions of the tracked fields in the positional values passed by
+        # Model.from_db().
+        self.raw_indexes: tuple[int, ...] = tuple(
+            meta.concrete_fields.index(f) for f in plain + described
+        )
+        self.raw_copies = tuple((self.raw_indexes[i], copy) for i, copy in self.copies)
+
+    def copy(self, values: Sequence[Any]) -> tuple[Any, ...]:
+        """
+        Returns the values with the values that can be changed in place
+        copied, to be recorded in a state.
+        """
+        values = list(values)
+        for i, copy in self.copies:
+            if values[i] is not UNKNOWN:
+                values[i] = copy(values[i])
+        return tuple(values)
+
+    def copy_raw(self, values: Sequence[Any]) -> tuple[Any, ...]:
+        """
+        Like ``copy()``, for the positional values passed by
+        ``Model.from_db()``.
+        """
+        values = list(values)
+        for i, copy in self.raw_copies:
+            if values[i] is not DEFERRED:
+                values[i] = copy(values[i])
+        return tuple(values)
+
+
+class State(Mapping[str, Any]):
+    """
+    A ``field -> value`` state of an instance, as returned by
+    ``previous_state()`` and ``old_state()``.
+
+    It behaves like a read-only dict. The values are kept in a tuple ordered
+    by the model's fields and the keys are shared by all states of the model,
+    which takes a fraction of the memory of a dict per state.
+    """
+
+    __slots__ = ("_index", "_values")
+
+    def __init__(self, index: dict[str, int], values: tuple[Any, ...]) -> None:
+        self._index = index
+        self._values = values
+
+    def __getitem__(self, key: str) -> Any:
+        return self._values[self._index[key]]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __repr__(self) -> str:
+        return repr(dict(zip(self._index, self._values)))
+
+
+def _diff(
+    values: Iterable[tuple[str, Any, Any]],
+    comparators: Mapping[str, Callable[[Any, Any], bool]],
+) -> dict[str, tuple[Any, Any]]:
+    if _hooks:
+        return timed_diff(_compare, values, comparators)
+    return _compare(values, comparators)
+
+
+def _compare(
+    values: Iterable[tuple[str, Any, Any]],
+    comparators: Mapping[str, Callable[[Any, Any], bool]],
+) -> dict[str, tuple[Any, Any]]:
+    changes = {}
+    for key, was, now in values:
+        if was is now or was is UNKNOWN or now is UNKNOWN:
+            continue
+        equal = comparators.get(key)
+        if equal is None:
+            if was != now:
+                changes[key] = (was, now)
+        elif not equal(was, now):
+            changes[key] = (
+                UNAVAILABLE if isinstance(was, Digest) else was,
+                UNAVAILABLE if isinstance(now, Digest) else now,
+            )
+    return changes
 
 
 class ChangesMixin:
@@ -43,6 +249,8 @@ class ChangesMixin:
         Changes from old_state to previous_state.
     3. old_changes()
         Changes from old_state to current_state.
+    4. has_changed(field)
+        Whether a field changed from previous_state to current_state.
 
     And the following methods to determine if an instance was/is persisted in
     the database:
@@ -74,98 +282,378 @@ class ChangesMixin:
 
     """
 
-    _states: list[dict[str, Any]]
+    track_related_objects: bool = True
+    """
+    Whether snapshots include the related object of each ``ForeignKey`` under
+    its field name (e.g. ``user``) next to the raw column value under its
+    attname (e.g. ``user_id``). Reading the related object runs a query unless
+    it is already cached on the instance, so set this to ``False`` to record
+    only concrete column values. ForeignKey changes are then reported under the
+    attname, e.g. ``{'user_id': (1, 2)}``.
+    """
+
+    lazy_snapshots: bool = False
+    """
+    Whether to defer taking the initial snapshot of instances loaded from the
+    database. The instance keeps a reference to the row values it was
+    constructed from and builds the snapshot only when a state or change is
+    requested, or right before a field is assigned for the first time.
+    Instances that are only read never pay for a snapshot.
+    """
+
+    track_dirty_fields: bool = False
+    """
+    Whether to record which fields are assigned. ``changes()`` and
+    ``has_changed()`` then compare only the assigned fields, and fields whose
+    values can be changed in place such as ``JSONField``, instead of every
+    tracked field.
+    """
+
+    post_change_on_commit: bool = False
+    """
+    Whether to send ``post_change`` when the transaction commits instead of
+    right after each save or delete inside a transaction. An instance saved
+    several times in a transaction gets a single signal with the changes from
+    its state before the first save to its state after the last one. Nothing
+    is sent if the transaction is rolled back.
+    """
+
+    tracked_fields: Sequence[str] | None = None
+    """
+    Names of the fields to track. All fields are tracked by default.
+    """
+
+    untracked_fields: Sequence[str] = ()
+    """
+    Names of fields that are not tracked, e.g. large ``TextField`` or
+    ``JSONField`` columns whose changes are never needed. Their values are
+    neither recorded in states nor compared.
+
+    The primary key is always tracked.
+    """
+
+    digest_fields: Sequence[str] = ()
+    """
+    Names of fields whose states record a hash of the value instead of the
+    value, e.g. ``TextField``, ``BinaryField`` or ``JSONField`` columns with
+    large values. Changes are still detected, but are reported as
+    ``(UNAVAILABLE, new value)``.
+    """
+
+    history_depth: int = 2
+    """
+    Number of states recorded after creates, saves and deletes that are kept,
+    at least 2 (the old and previous states). Keep more to inspect the
+    intermediate states of an instance saved several times with
+    ``state_at()`` and ``changes_between()``.
+    """
+
+    _field_plan: _FieldPlan
+    _states: MutableSequence[State] = _Untracked()  # type: ignore[assignment]
+    _dirty: set[str] = _Untracked()  # type: ignore[assignment]
+    _async_post_change: bool
+    _raw_state: tuple[Any, ...]
     _meta: Options
+    _state: ModelState
     pk: Any
 
+    if TYPE_CHECKING:
+
+        def save(self, *args: Any, **kwargs: Any) -> None: ...
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        if cls.history_depth < 2:
+            raise ValueError(f"{cls.__name__}.history_depth must be at least 2")
+        if cls.lazy_snapshots or cls.track_dirty_fields:
+            # Wraps the __setattr__ of the model, or the one it inherits, once.
+            setattr_ = cls.__setattr__
+            if setattr_ not in _tracking_setattrs:
+                cls.__setattr__ = _tracking_setattr(setattr_)
+
+    @classmethod
+    def _get_field_plan(cls) -> _FieldPlan:
+        plan: _FieldPlan | None = cls.__dict__.get("_field_plan")
+        if plan is None or plan.source is not plan.meta.concrete_fields:
+            plan = _FieldPlan(
+                cls._meta, cls.tracked_fields, cls.untracked_fields, cls.digest_fields
+            )
+            cls._field_plan = plan
+        return plan
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
 
-        # Connect signals once per class (on first instantiation)
-        cls = self.__class__
-        if cls not in _connected_classes:
-            _connected_classes.add(cls)
-            # cls is guaranteed to be a Model subclass at runtime since ChangesMixin
-            # must be used with models.Model
-            sender: type[models.Model] = cls  # type: ignore[assignment]
-            signals.post_save.connect(
-                _post_save,
-                sender=sender,
-                dispatch_uid=f"django-changes-{cls.__name__}",
-            )
-            signals.post_delete.connect(
-                _post_delete,
-                sender=sender,
-                dispatch_uid=f"django-changes-{cls.__name__}",
-            )
-
-        self._states = []
-        self._save_state(new_instance=True)
+        if suspended.get() & INIT:
+            # Created by untracked(), the instance has no states.
+            return
+        self._start_tracking()
+        # Model.from_db() passes the values of all concrete fields positionally.
+        if self.lazy_snapshots and not kwargs and len(args) == len(self._meta.concrete_fields):
+            # Values that can be changed in place are copied now, before the
+            # instance can change them.
+            plan = self._get_field_plan()
+            self._raw_state = plan.copy_raw(args) if plan.raw_copies else args
+        else:
+            self._save_state(new_instance=True)
+
+    def _start_tracking(self, states: Iterable[State] = ()) -> None:
+        if self.track_dirty_fields:
+            self._dirty = set()
+        # A deque has a large fixed size, a list of up to 3 states is cheaper
+        # to trim.
+        if self.history_depth == 2:
+            self._states = list(states)
+        else:
+            self._states = deque(states, maxlen=self.history_depth)
+
+    def _assigning(self, name: str) -> None:
+        plan = self._get_field_plan()
+        if name in plan.names:
+            # Take the pending snapshot before a tracked field is first
+            # assigned.
+            self._load_raw_state()
+            if "_dirty" in self.__dict__:
+                self._dirty.add(plan.aliases.get(name, name))
+
+    def _load_raw_state(self) -> None:
+        raw_state = self.__dict__.pop("_raw_state", None)
+        if raw_state is None:
+            return
+        if _hooks:
+            state = timed_snapshot(self, self._raw_snapshot, raw_state)
+        else:
+            state = self._raw_snapshot(raw_state)
+        self._states.append(state)
+
+    def _raw_snapshot(self, raw_state: Sequence[Any]) -> State:
+        plan = self._get_field_plan()
+        values = [raw_state[index] for index in plan.raw_indexes]
+        values = [UNKNOWN if value is DEFERRED else value for value in values]
+        if not self.track_related_objects:
+            return State(plan.index, tuple(values))
+        for name, attname in plan.aliases.items():
+            loaded = values[plan.index[attname]] is not UNKNOWN
+            values.append(getattr(self, name) if loaded else UNKNOWN)
+        return State(plan.related_index, tuple(values))
+
+    def _save_state(
+        self,
+        new_instance: bool = False,
+        event_type: str | int = "save",
+        update_fields: Iterable[str] | None = None,
+        send_signal: bool = True,
+    ) -> None:
+        self._load_raw_state()
 
-    def _save_state(self, new_instance: bool = False, event_type: str | int = "save") -> None:
         # Pipe the pk on deletes so that a correct snapshot of the current
         # state can be taken.
         if event_type == DELETE:
             self.pk = None
 
         # Save current state.
-        self._states.append(self.current_state())
-
-        # Drop the previous old state
+        state = self._snapshot()
+        plan = self._field_plan
+        if plan.copies:
+            state = State(state._index, plan.copy(state._values))
+        if update_fields is not None and self._states:
+            # Fields left out of a partial save keep their previous values.
+            state = self._merge_state(self._states[-1], state, update_fields)
+        self._states.append(state)
+        if self.track_dirty_fields:
+            if update_fields is None:
+                self._dirty.clear()
+            else:
+                self._dirty.difference_update(plan.aliases.get(f, f) for f in update_fields)
+
+        # Drop the oldest state, e.g. with the default depth:
         # _states == [previous old state, old state, previous state]
         #             ^^^^^^^^^^^^^^^^^^
-        if len(self._states) > 2:
-            self._states.pop(0)
+        if len(self._states) > self.history_depth:
+            del self._states[0]
 
         # Send post_change signal unless this is a new instance
-        if not new_instance:
-            post_change.send(sender=self.__class__, instance=self)
+        if not new_instance and send_signal:
+            send_post_change(self)
+
+    def _merge_state(self, previous: State, current: State, update_fields: Iterable[str]) -> State:
+        if previous._index is not current._index:
+            return current
+        plan = self._get_field_plan()
+        saved = {plan.aliases.get(name, name) for name in update_fields}
+        values = tuple(
+            now if plan.aliases.get(key, key) in saved else was
+            for key, was, now in zip(current._index, previous._values, current._values)
+        )
+        return State(current._index, values)
 
     def current_state(self) -> dict[str, Any]:
         """
         Returns a ``field -> value`` dict of the current state of the instance.
-        """
-        field_names: set[str] = set()
-        for f in self._meta.local_fields:
-            field_names.add(f.name)
-            field_names.add(f.attname)
-        return {field_name: getattr(self, field_name) for field_name in field_names}
 
-    def previous_state(self) -> dict[str, Any]:
+        Deferred fields are not loaded, their value is ``UNKNOWN``.
+        """
+        state = self._snapshot()
+        return dict(zip(state._index, state._values))
+
+    def _snapshot(self) -> State:
+        if _hooks:
+            return timed_snapshot(self, self._take_snapshot)
+        return self._take_snapshot()
+
+    def _take_snapshot(self) -> State:
+        plan = self._field_plan
+        if plan.source is not plan.meta.concrete_fields:
+            plan = self._get_field_plan()
+        loaded = self.__dict__
+        # A field is deferred if its attname is missing from the instance
+        # dict, the same test as Model.get_deferred_fields().
+        values = tuple(map(loaded.get, plan.plain_attnames, plan.unknowns))
+        if plan.descriptor_attnames:
+            values += tuple(
+                getattr(self, attname) if attname in loaded else UNKNOWN
+                for attname in plan.descriptor_attnames
+            )
+        if not (plan.aliases and self.track_related_objects):
+            return State(plan.index, values)
+        values += tuple(
+            getattr(self, name) if attname in loaded else UNKNOWN
+            for name, attname in plan.aliases.items()
+        )
+        return State(plan.related_index, values)
+
+    def previous_state(self) -> State:
         """
-        Returns a ``field -> value`` dict of the state of the instance after it
+        Returns a ``field -> value`` mapping of the state of the instance after it
         was created, saved or deleted the previous time.
         """
-        if len(self._states) > 1:
-            return self._states[1]
-        return self._states[0]
+        self._load_raw_state()
+        return self._states[-1]
 
-    def old_state(self) -> dict[str, Any]:
+    def old_state(self) -> State:
         """
-        Returns a ``field -> value`` dict of the state of the instance after
+        Returns a ``field -> value`` mapping of the state of the instance after
         it was created, saved or deleted the previous previous time. Returns
         the previous state if there is no previous previous state.
         """
-        return self._states[0]
+        self._load_raw_state()
+        if len(self._states) > 1:
+            return self._states[-2]
+        return self._states[-1]
+
+    def state_at(self, n: int) -> State:
+        """
+        Returns the ``n``-th of the kept states, oldest first. Negative
+        indexes count back from the previous state, e.g. ``state_at(-1)`` is
+        ``previous_state()``. Raises ``IndexError`` if the state is not kept,
+        see ``history_depth``.
+        """
+        self._load_raw_state()
+        return self._states[n]
+
+    def changes_between(self, i: int, j: int) -> dict[str, tuple[Any, Any]]:
+        """
+        Returns a ``field -> (value in state i, value in state j)`` dict of
+        changes between two kept states, see ``state_at()``.
+
+        Examples::
+
+            >>> user = User.objects.create(name="a")  # history_depth = 3
+            >>> user.name = "b"
+            >>> user.save()
+            >>> user.name = "c"
+            >>> user.save()
+            >>> user.changes_between(0, 1)
+            {'name': ('a', 'b')}
+            >>> user.changes_between(0, -1)
+            {'name': ('a', 'c')}
+        """
+        return self._changes(self.state_at(i), self.state_at(j))
 
     def _changes(
-        self, other: dict[str, Any], current: dict[str, Any]
+        self, other: Mapping[str, Any], current: Mapping[str, Any]
     ) -> dict[str, tuple[Any, Any]]:
-        return {key: (was, current[key]) for key, was in other.items() if was != current[key]}
+        if (
+            isinstance(other, State)
+            and isinstance(current, State)
+            and other._index is current._index
+        ):
+            pairs = zip(other._index, other._values, current._values)
+        else:
+            pairs = ((key, was, current[key]) for key, was in other.items())
+        return _diff(pairs, self._get_field_plan().comparators)
+
+    def _current_value(self, key: str) -> Any:
+        plan = self._get_field_plan()
+        if plan.aliases.get(key, key) not in self.__dict__:
+            return UNKNOWN
+        return getattr(self, key)
+
+    def _dirty_changes(self) -> dict[str, tuple[Any, Any]]:
+        plan = self._get_field_plan()
+        previous = self.previous_state()
+        keys = []
+        for attname in self._dirty | plan.mutable_attnames:
+            keys.append(attname)
+            if attname in plan.related_names and plan.related_names[attname] in previous:
+                keys.append(plan.related_names[attname])
+        return _diff(
+            ((key, previous[key], self._current_value(key)) for key in keys), plan.comparators
+        )
 
     def changes(self) -> dict[str, tuple[Any, Any]]:
         """
         Returns a ``field -> (previous value, current value)`` dict of changes
         from the previous state to the current state.
         """
-        return self._changes(self.previous_state(), self.current_state())
+        if self.track_dirty_fields:
+            return self._dirty_changes()
+        return self._changes(self.previous_state(), self._snapshot())
+
+    def changes_by_table(self) -> dict[str, dict[str, tuple[Any, Any]]]:
+        """
+        Returns the changes from the previous state to the current state
+        grouped by database table, which tells apart the fields of parent
+        and child models with multi-table inheritance.
+
+        Examples::
+
+            >>> member.name = "My Real Name"  # Field of the parent User
+            >>> member.changes_by_table()
+            {'tests_user': {'name': ('Foo Bar', 'My Real Name')}}
+        """
+        tables = self._get_field_plan().tables
+        by_table: dict[str, dict[str, tuple[Any, Any]]] = {}
+        for key, change in self.changes().items():
+            by_table.setdefault(tables[key], {})[key] = change
+        return by_table
+
+    def has_changed(self, field: str) -> bool:
+        """
+        Returns true if the field changed from the previous state to the
+        current state. Accepts the name or attname of a field, and raises
+        ``ValueError`` for fields that are not tracked.
+        """
+        plan = self._get_field_plan()
+        if field not in plan.names:
+            raise ValueError(f"{type(self).__name__}.{field} is not tracked")
+        attname = plan.aliases.get(field, field)
+        if (
+            self.track_dirty_fields
+            and attname not in self._dirty
+            and attname not in plan.mutable_attnames
+        ):
+            return False
+        previous = self.previous_state()
+        key = field if field in previous else attname
+        return bool(_diff([(key, previous[key], self._current_value(key))], plan.comparators))
 
     def old_changes(self) -> dict[str, tuple[Any, Any]]:
         """
         Returns a ``field -> (previous value, current value)`` dict of changes
         from the old state to the current state.
         """
-        return self._changes(self.old_state(), self.current_state())
+        return self._changes(self.old_state(), self._snapshot())
 
     def previous_changes(self) -> dict[str, tuple[Any, Any]]:
         """
@@ -174,6 +662,82 @@ class ChangesMixin:
         """
         return self._changes(self.old_state(), self.previous_state())
 
+    async def asave(self, *args: Any, **kwargs: Any) -> None:
+        """
+        Saves the instance like ``Model.asave()`` and sends ``post_change``
+        with ``Signal.asend()`` once the save returns, so that coroutine
+        receivers run concurrently on the event loop.
+        """
+        self._async_post_change = False
+        try:
+            await super().asave(*args, **kwargs)  # type: ignore[misc]
+        finally:
+            send = self.__dict__.pop("_async_post_change")
+        if send:
+            await asend_post_change(self)
+
+    async def adelete(self, *args: Any, **kwargs: Any) -> tuple[int, dict[str, int]]:
+        """
+        Deletes the instance like ``Model.adelete()`` and sends
+        ``post_change`` with ``Signal.asend()`` once the delete returns.
+        """
+        self._async_post_change = False
+        try:
+            deleted = await super().adelete(*args, **kwargs)  # type: ignore[misc]
+        finally:
+            send = self.__dict__.pop("_async_post_change")
+        if send:
+            await asend_post_change(self)
+        return deleted
+
+    def save_changed(self, update_fields: Iterable[str] | None = None, **kwargs: Any) -> bool:
+        """
+        Saves the instance, updating only the columns that changed from the
+        previous state. Untracked fields and fields whose previous value is
+        unknown are always saved. No query is made if nothing changed, and
+        with multi-table inheritance, tables without changes are not updated.
+
+        If ``update_fields`` is given, only the changed columns among those
+        fields are saved.
+
+        New instances are saved in full. Returns true if the instance was
+        saved.
+
+        Examples::
+
+            >>> user = User.objects.get(pk=1)
+            >>> user.name = "My Real Name"
+            >>> user.save_changed()  # UPDATE ... SET name = ...
+            True
+            >>> user.save_changed()
+            False
+        """
+        pk_field = self._meta.pk
+        changes = self.changes()
+        if self._state.adding or pk_field is None or pk_field.attname in changes:
+            self.save(update_fields=update_fields, **kwargs)
+            return True
+
+        plan = self._get_field_plan()
+        previous = self.previous_state()
+        loaded = self.__dict__
+        changed = {plan.aliases.get(key, key) for key in changes}
+        changed.update(attname for attname in plan.untracked_attnames if attname in loaded)
+        changed.update(
+            attname
+            for attname in plan.attnames
+            if previous[attname] is UNKNOWN and attname in loaded
+        )
+        changed.discard(pk_field.attname)
+        if update_fields is not None:
+            attnames = {f.name: f.attname for f in self._meta.concrete_fields}
+            changed.intersection_update(attnames.get(name, name) for name in update_fields)
+        if not changed:
+            return False
+
+        self.save(update_fields=changed, **kwargs)
+        return True
+
     def was_persisted(self) -> bool:
         """
         Returns true if the instance was persisted (saved) in its old
@@ -194,7 +758,7 @@ class ChangesMixin:
         pk_field = self._meta.pk
         if pk_field is None:
             return False
-        return bool(self.old_state()[pk_field.name])
+        return bool(self.old_state()[pk_field.attname])
 
     def is_persisted(self) -> bool:
         """
@@ -215,22 +779,108 @@ class ChangesMixin:
         """
         return bool(self.pk)
 
-    def old_instance(self) -> ChangesMixin:
+    def old_instance(self) -> Self:
         """
-        Returns an instance of this model in its old state.
+        Returns a read-only instance of this model in its old state.
+
+        The instance is built without queries: fields with unknown values,
+        untracked fields and digest fields are left deferred, and related
+        objects recorded in the state are cached on it. Calling ``save()`` or
+        ``delete()`` on it raises ``TypeError``.
+
+        ``Model.__init__()`` is not called: ``post_init`` is sent for the
+        instance, but ``pre_init`` is not.
         """
-        return self.__class__(**self.old_state())
+        return self._instance_from_state(self.old_state())
 
-    def previous_instance(self) -> ChangesMixin:
+    def previous_instance(self) -> Self:
         """
-        Returns an instance of this model in its previous state.
+        Returns a read-only instance of this model in its previous state, see
+        ``old_instance()``.
         """
-        return self.__class__(**self.previous_state())
+        return self._instance_from_state(self.previous_state())
+
+    def _instance_from_state(self, state: State) -> Self:
+        # Like Model.from_db(), skip __init__ and set the loaded attnames
+        # directly. Unknown values and digests are left deferred.
+        cls = self.__class__
+        plan = self._get_field_plan()
+        instance = cls.__new__(cls)
+        loaded = instance.__dict__
+        loaded["_state"] = ModelState()
+        # Values that can be changed in place are copied so that the state
+        # doesn't change with the instance.
+        values = plan.copy(state._values) if plan.copies else state._values
+        for key, value in zip(state._index, values):
+            if value is UNKNOWN or isinstance(value, Digest):
+                continue
+            if key in plan.index:
+                loaded[key] = value
+            elif value is not None:
+                self._meta.get_field(key).set_cached_value(instance, value)  # type: ignore[union-attr]
+        instance._state.adding = instance.pk is None
+        instance._state.db = self._state.db
+        # Like Model.__init__(), before the instance is tracked. pre_init is
+        # not sent, there are no arguments to send with it.
+        signals.post_init.send(sender=cls, instance=instance)
+        # The instance never changes, its only state is the one it was built from.
+        loaded["_states"] = [state]
+        if self.track_dirty_fields:
+            loaded["_dirty"] = set()
+        loaded["save"] = loaded["delete"] = _read_only
+        return instance
+
+
+_tracking_setattrs: set[Callable[[Any, str, Any], None]] = set()
+
+
+def _tracking_setattr(
+    setattr_: Callable[[Any, str, Any], None],
+) -> Callable[[Any, str, Any], None]:
+    """
+    Wraps the ``__setattr__`` of a model with ``lazy_snapshots`` or
+    ``track_dirty_fields``, to see tracked fields being assigned.
+    """
+
+    def __setattr__(self: ChangesMixin, name: str, value: Any) -> None:
+        loaded = self.__dict__
+        if "_raw_state" in loaded or "_dirty" in loaded:
+            self._assigning(name)
+        setattr_(self, name, value)
 
+    _tracking_setattrs.add(__setattr__)
+    return __setattr__
 
-def _post_save(sender: type[models.Model], instance: ChangesMixin, **kwargs: Any) -> None:
-    instance._save_state(new_instance=False, event_type=SAVE)
+
+def _read_only(*args: Any, **kwargs: Any) -> NoReturn:
+    raise TypeError("Instances built from a state are read-only")
+
+
+def _post_save(
+    sender: type[models.Model],
+    instance: ChangesMixin,
+    update_fields: frozenset[str] | None = None,
+    **kwargs: Any,
+) -> None:
+    if suspended.get() & SNAPSHOTS or "_states" not in instance.__dict__:
+        return
+    instance._save_state(new_instance=False, event_type=SAVE, update_fields=update_fields)
 
 
 def _post_delete(sender: type[models.Model], instance: ChangesMixin, **kwargs: Any) -> None:
+    if suspended.get() & SNAPSHOTS or "_states" not in instance.__dict__:
+        return
     instance._save_state(new_instance=False, event_type=DELETE)
+
+
+def _class_prepared(sender: type[models.Model], **kwargs: Any) -> None:
+    # Sent for every concrete and proxy model, including each subclass of a
+    # tracked model, as signals are sent with the class of the saved instance.
+    if issubclass(sender, ChangesMixin):
+        sender._get_field_plan()
+        dispatch_uid = f"django-model-changes-{sender._meta.label}"
+        signals.post_save.connect(_post_save, sender=sender, dispatch_uid=dispatch_uid)
+        signals.post_delete.connect(_post_delete, sender=sender, dispatch_uid=dispatch_uid)
+
+
+signals.class_prepared.connect(_class_prepared)
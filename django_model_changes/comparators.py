@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+from typing import Any
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class Comparator:
+    """
+    Decides how the values of a field type are recorded in states and
+    compared.
+
+    The default records a reference to the value and compares with ``==``.
+    Subclasses override ``copy()`` for values that can be changed in place,
+    so that the recorded value doesn't change with the instance, and
+    ``equal()`` for values that are expensive or wrong to compare with
+    ``==``. Identical values are always equal, ``equal()`` is only called for
+    different objects.
+    """
+
+    copies = False
+    """
+    Whether ``copy()`` needs to be called when a value is recorded. Fields
+    whose values are copied are also compared by ``changes()`` when they
+    weren't assigned, see ``ChangesMixin.track_dirty_fields``.
+    """
+
+    def copy(self, value: Any) -> Any:
+        return value
+
+    def equal(self, a: Any, b: Any) -> bool:
+        return a == b
+
+
+class DeepCopyComparator(Comparator):
+    """
+    Records a deep copy of values that can be changed in place, such as the
+    dicts and lists of a ``JSONField``.
+    """
+
+    copies = True
+
+    def copy(self, value: Any) -> Any:
+        return copy.deepcopy(value)
+
+
+class BytesComparator(Comparator):
+    """
+    Records ``bytearray`` and ``memoryview`` values of a ``BinaryField`` as
+    ``bytes``, which can't be changed in place.
+    """
+
+    copies = True
+
+    def copy(self, value: Any) -> Any:
+        if isinstance(value, bytearray | memoryview):
+            return bytes(value)
+        return value
+
+
+_comparators: dict[type[models.Field[Any, Any]], Comparator] = {
+    models.JSONField: DeepCopyComparator(),
+    models.BinaryField: BytesComparator(),
+}
+
+
+def register_comparator(field_class: type[models.Field[Any, Any]], comparator: Comparator) -> None:
+    """
+    Uses ``comparator`` for the values of ``field_class`` and its
+    subclasses. Register comparators before the models using the field are
+    prepared, e.g. next to the field class::
+
+        >>> class PointComparator(Comparator):
+        >>>     def equal(self, a, b):
+        >>>         return a.equals_exact(b, tolerance=1e-9)
+
+        >>> register_comparator(PointField, PointComparator())
+    """
+    _comparators[field_class] = comparator
+
+
+def get_comparator(field: models.Field[Any, Any]) -> Comparator | None:
+    """
+    Returns the comparator registered for the class of ``field`` or its
+    closest base class, or ``None`` to compare with ``==``.
+    """
+    for cls in type(field).__mro__:
+        comparator = _comparators.get(cls)
+        if comparator is not None:
+            return comparator
+    return None
+
+
+class Digest:
+    """
+    A hash of a value, recorded in states instead of the value by
+    ``DigestComparator``.
+    """
+
+    __slots__ = ("digest",)
+
+    def __init__(self, digest: bytes) -> None:
+        self.digest = digest
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Digest) and other.digest == self.digest
+
+    def __hash__(self) -> int:
+        return hash(self.digest)
+
+    def __repr__(self) -> str:
+        return f"Digest({self.digest.hex()})"
+
+
+class _Unavailable:
+    def __repr__(self) -> str:
+        return "UNAVAILABLE"
+
+
+UNAVAILABLE: Any = _Unavailable()
+"""
+Placeholder for the value before a change of a field in
+``ChangesMixin.digest_fields``, whose states only record a hash.
+"""
+
+
+class DigestComparator(Comparator):
+    """
+    Records a 128-bit BLAKE2 hash of values instead of the values, for large
+    text, binary and JSON columns. Changes are still detected, but the value
+    before a change is not available. ``None`` is recorded as is.
+    """
+
+    copies = True
+
+    def copy(self, value: Any) -> Any:
+        if value is None or isinstance(value, Digest):
+            return value
+        if isinstance(value, str):
+            data = value.encode()
+        elif isinstance(value, bytes | bytearray | memoryview):
+            data = value
+        else:
+            data = json.dumps(value, sort_keys=True, cls=DjangoJSONEncoder).encode()
+        return Digest(hashlib.blake2b(data, digest_size=16).digest())
+
+    def equal(self, a: Any, b: Any) -> bool:
+        return self.copy(a) == self.copy(b)
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Bit flags of what is suspended in the current context.
+SNAPSHOTS = 1
+DISPATCH = 2
+INIT = 4
+
+suspended: ContextVar[int] = ContextVar("django_model_changes_suspended", default=0)
+
+
+@contextmanager
+def suspend_tracking(snapshots: bool = True, dispatch: bool = True) -> Iterator[None]:
+    """
+    Suspends recording states after saves and deletes, sending
+    ``post_change`` and ``post_change_bulk``, or both, in the block.
+
+    The state is kept in a context variable, so other threads and asyncio
+    tasks are not affected. Instances saved while snapshots are suspended
+    keep their previous state, and still report the saved changes
+    afterwards::
+
+        >>> with suspend_tracking():
+        >>>     for user in User.objects.all():
+        >>>         user.backfilled = True
+        >>>         user.save()
+
+        >>> with suspend_tracking(snapshots=False):
+        >>>     user.save()  # States are recorded, post_change is not sent
+    """
+    flags = suspended.get()
+    if snapshots:
+        flags |= SNAPSHOTS
+    if dispatch:
+        flags |= DISPATCH
+    token = suspended.set(flags)
+    try:
+        yield
+    finally:
+        suspended.reset(token)
+
+
+@contextmanager
+def untracked() -> Iterator[None]:
+    """
+    Creates untracked instances in the block, e.g. rows loaded by a data
+    migration. Untracked instances take no snapshot when they are created
+    and have no states, even once the block exits: their saves and deletes
+    record nothing and send no ``post_change``, and methods that read their
+    states, such as ``changes()``, raise ``AttributeError``::
+
+        >>> with untracked():
+        >>>     for user in User.objects.all():
+        >>>         user.backfilled = True
+        >>>         user.save()
+    """
+    token = suspended.set(suspended.get() | INIT)
+    try:
+        yield
+    finally:
+        suspended.reset(token)
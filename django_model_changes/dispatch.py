@@ -0,0 +1,346 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any, NamedTuple, Protocol
+
+from django.db import models, transaction
+
+from .context import DISPATCH, suspended
+from .payload import ChangePayload
+from .signals import post_change
+
+if TYPE_CHECKING:
+    from django.db.backends.base.base import BaseDatabaseWrapper
+
+    from .changes import ChangesMixin, State
+
+
+def send_post_change(instance: ChangesMixin) -> None:
+    """
+    Sends ``post_change`` for the state that was just recorded for the
+    instance.
+
+    If the model has ``post_change_on_commit`` enabled and a transaction is
+    open, the signal is sent when the transaction commits instead, and not at
+    all if it is rolled back. Nothing is sent inside ``suspend_tracking()``.
+    """
+    if suspended.get() & DISPATCH:
+        return
+    if instance.post_change_on_commit:
+        connection = transaction.get_connection(instance._state.db)
+        if connection.in_atomic_block:
+            _pending_changes(connection).add(instance, instance.old_state())
+            return
+    if "_async_post_change" in instance.__dict__:
+        # Sent by asave() or adelete() once the save or delete returns.
+        instance._async_post_change = True
+        return
+    _send(instance, None)
+
+
+async def asend_post_change(instance: ChangesMixin) -> None:
+    """
+    Sends ``post_change`` for the state that was just recorded for the
+    instance with ``Signal.asend()``, which runs coroutine receivers
+    concurrently and sync receivers in a thread.
+    """
+    sender = type(instance)
+    if post_change.has_listeners(sender):
+        changes = instance.previous_changes()
+        await post_change.asend(
+            sender=sender,
+            instance=instance,
+            changes=changes,
+            payload=ChangePayload(instance, changes),
+        )
+
+
+def _send(instance: ChangesMixin, changes: dict[str, tuple[Any, Any]] | None) -> None:
+    sender = type(instance)
+    if not post_change.has_listeners(sender):
+        return
+    if changes is None:
+        changes = instance.previous_changes()
+    post_change.send(
+        sender=sender,
+        instance=instance,
+        changes=changes,
+        payload=ChangePayload(instance, changes),
+    )
+
+
+class _PendingChanges:
+    """
+    ``post_change`` signals buffered until the transaction commits.
+
+    One buffer is registered with ``on_commit()`` per savepoint, so that
+    Django drops it when its savepoint is rolled back. The buffers of one
+    transaction share the set of instances already sent, so that each
+    instance is sent once however many times it was saved.
+    """
+
+    def __init__(self, sent: set[int]) -> None:
+        # id(instance) -> (instance, old state before its first save)
+        self.changes: dict[int, tuple[ChangesMixin, State]] = {}
+        self.sent = sent
+
+    def add(self, instance: ChangesMixin, old_state: State) -> None:
+        self.changes.setdefault(id(instance), (instance, old_state))
+
+    def __call__(self) -> None:
+        for key, (instance, old_state) in self.changes.items():
+            if key in self.sent:
+                continue
+            self.sent.add(key)
+            _send(instance, instance._changes(old_state, instance.previous_state()))
+
+
+class _Buffer(Protocol):
+    def __call__(self) -> None: ...
+
+
+def _pending_changes(connection: BaseDatabaseWrapper) -> _PendingChanges:
+    return _on_commit_buffer(
+        connection,
+        _PendingChanges,
+        lambda pending: True,
+        lambda others: _PendingChanges(others[-1].sent if others else set()),
+    )
+
+
+def _on_commit_buffer[T: _Buffer](
+    connection: BaseDatabaseWrapper,
+    cls: type[T],
+    match: Callable[[T], bool],
+    create: Callable[[list[T]], T],
+) -> T:
+    """
+    Returns the buffer of type ``cls`` for which ``match()`` is true that is
+    registered with ``on_commit()`` for the current savepoint, or registers
+    the one returned by ``create()``, which gets the matching buffers of the
+    other savepoints of the transaction.
+
+    One buffer is registered per savepoint, so that Django drops it when its
+    savepoint is rolled back.
+    """
+    # atomic(savepoint=False) blocks add None, they can't be rolled back on their own.
+    savepoint_ids = set(connection.savepoint_ids) - {None}
+    others: list[T] = []
+    # Entries are (savepoint ids, func, robust).
+    for entry in connection.run_on_commit:
+        sids = entry[0]
+        func: Any = entry[1]
+        if isinstance(func, cls) and match(func):
+            if sids - {None} == savepoint_ids:
+                return func
+            others.append(func)
+    buffer = create(others)
+    connection.on_commit(buffer)
+    return buffer
+
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeEvent(NamedTuple):
+    """
+    A change recorded for an instance, detached from the instance.
+    """
+
+    model: type[models.Model]
+    pk: Any
+    changes: dict[str, list[Any]]
+    """
+    The changes encoded by ``ChangePayload``, by attname and without live
+    related objects.
+    """
+    created: float
+    """``time.monotonic()`` when the event was queued."""
+
+
+class ThreadedDispatcher:
+    """
+    Hands ``post_change`` events to a handler on a pool of worker threads,
+    so that slow receivers (audit writes, publishing to a broker, cache
+    invalidation) don't run in the thread that saved the instance.
+
+    Events are kept in a bounded queue. When it is full, ``policy`` decides
+    what happens to a new event:
+
+    ``"block"``
+        Wait until a worker makes room.
+    ``"drop_oldest"``
+        Drop the oldest queued event to make room.
+    ``"sync"``
+        Handle the event in the calling thread.
+
+    Example::
+
+        >>> def publish(event):
+        >>>     broker.send(event.model._meta.label, event.pk, event.changes)
+
+        >>> dispatcher = ThreadedDispatcher(publish, workers=4, max_size=10_000)
+        >>> dispatcher.connect(sender=User)
+    """
+
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    SYNC = "sync"
+
+    def __init__(
+        self,
+        handler: Callable[[ChangeEvent], None],
+        workers: int = 1,
+        max_size: int = 1000,
+        policy: str = BLOCK,
+    ) -> None:
+        if policy not in (self.BLOCK, self.DROP_OLDEST, self.SYNC):
+            raise ValueError(f"Unknown policy {policy!r}")
+        self.handler = handler
+        self.workers = workers
+        self.policy = policy
+        self._queue: queue.Queue[ChangeEvent | None] = queue.Queue(max_size)
+        self._threads: list[threading.Thread] = []
+        # Senders passed to connect(), None for all models.
+        self._senders: set[type[models.Model] | None] = set()
+        self._stopped = False
+        self._lock = threading.Lock()
+        self._processed = 0
+        self._dropped = 0
+        self._handled_synchronously = 0
+        self._errors = 0
+        self._lag = 0.0
+        self._max_lag = 0.0
+
+    def connect(self, sender: type[models.Model] | None = None) -> None:
+        """
+        Connects the dispatcher to ``post_change`` and starts the workers.
+        """
+        self.start()
+        post_change.connect(self.receiver, sender=sender, weak=False)
+        self._senders.add(sender)
+
+    def disconnect(self, sender: type[models.Model] | None = None) -> None:
+        post_change.disconnect(self.receiver, sender=sender)
+        self._senders.discard(sender)
+
+    def receiver(self, sender: type[models.Model], instance: ChangesMixin, **kwargs: Any) -> None:
+        payload = kwargs.get("payload")
+        if payload is None:
+            changes = kwargs.get("changes")
+            if changes is None:
+                changes = instance.previous_changes()
+            payload = ChangePayload(instance, changes)
+        self.put(ChangeEvent(sender, payload.pk, payload.changes, time.monotonic()))
+
+    def put(self, event: ChangeEvent) -> None:
+        """
+        Queues an event, applying the policy if the queue is full. Once the
+        dispatcher is shut down, events are handled in the calling thread.
+        """
+        if self._stopped:
+            with self._lock:
+                self._handled_synchronously += 1
+            self._handle(event)
+            return
+        if self.policy == self.BLOCK:
+            self._queue.put(event)
+            return
+        while True:
+            try:
+                self._queue.put_nowait(event)
+                return
+            except queue.Full:
+                pass
+            if self.policy == self.SYNC:
+                with self._lock:
+                    self._handled_synchronously += 1
+                self._handle(event)
+                return
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                continue
+            self._queue.task_done()
+            with self._lock:
+                self._dropped += 1
+
+    def start(self) -> None:
+        """
+        Starts the worker threads, if they are not running yet.
+        """
+        with self._lock:
+            self._stopped = False
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(
+                    target=self._work, name="django-model-changes-dispatcher", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def join(self) -> None:
+        """
+        Blocks until every queued event has been handled.
+        """
+        self._queue.join()
+
+    def shutdown(self) -> None:
+        """
+        Disconnects the dispatcher from ``post_change``, handles the queued
+        events and stops the worker threads.
+        """
+        for sender in list(self._senders):
+            self.disconnect(sender)
+        with self._lock:
+            self._stopped = True
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join()
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns the current queue depth and counters. ``lag`` is the time in
+        seconds the last handled event waited in the queue, ``max_lag`` the
+        longest wait so far.
+        """
+        with self._lock:
+            return {
+                "depth": self._queue.qsize(),
+                "processed": self._processed,
+                "dropped": self._dropped,
+                "handled_synchronously": self._handled_synchronously,
+                "errors": self._errors,
+                "lag": self._lag,
+                "max_lag": self._max_lag,
+            }
+
+    def _work(self) -> None:
+        while True:
+            event = self._queue.get()
+            try:
+                if event is None:
+                    return
+                lag = time.monotonic() - event.created
+                with self._lock:
+                    self._lag = lag
+                    self._max_lag = max(self._max_lag, lag)
+                self._handle(event)
+            finally:
+                self._queue.task_done()
+
+    def _handle(self, event: ChangeEvent) -> None:
+        try:
+            self.handler(event)
+        except Exception:
+            logger.exception("Error handling change of %s %s", event.model.__name__, event.pk)
+            with self._lock:
+                self._errors += 1
+        else:
+            with self._lock:
+                self._processed += 1
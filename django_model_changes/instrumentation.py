@@ -0,0 +1,257 @@
+"""
+Optional timing and counters for snapshots, diffs and ``post_change``
+dispatch.
+
+Nothing is measured until a hook is added. Snapshots, diffs and
+``post_change`` check whether any hook is active and only then measure
+themselves, so that uninstrumented code pays one check.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from functools import wraps
+from typing import TYPE_CHECKING, Any
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.dispatch import Signal
+
+if TYPE_CHECKING:
+    from .changes import ChangesMixin, State
+
+logger = logging.getLogger(__name__)
+
+
+class Hook:
+    """
+    Receives measurements. Subclasses override the methods they need.
+    Durations are in seconds.
+    """
+
+    def snapshot(self, instance: ChangesMixin, duration: float, queries: int) -> None:
+        """
+        Called after a snapshot of ``instance`` was taken. ``queries`` is
+        the number of queries run while taking it, e.g. to read related
+        objects.
+        """
+
+    def diff(self, duration: float, fields_compared: int) -> None:
+        """
+        Called after two states were compared.
+        """
+
+    def dispatch(self, sender: type[Any], receiver: Callable[..., Any], duration: float) -> None:
+        """
+        Called after a ``post_change`` receiver returned.
+        """
+
+
+class StatsCollector(Hook):
+    """
+    Collects totals of the measurements, e.g.::
+
+        >>> stats = StatsCollector()
+        >>> add_hook(stats)
+        >>> stats.stats()
+        {'snapshots': 12, 'snapshot_time': 0.0004, 'snapshot_queries': 0, ...}
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._snapshots = 0
+            self._snapshot_time = 0.0
+            self._snapshot_queries = 0
+            self._diffs = 0
+            self._diff_time = 0.0
+            self._fields_compared = 0
+            self._dispatches: dict[str, int] = {}
+            self._dispatch_time: dict[str, float] = {}
+
+    def snapshot(self, instance: ChangesMixin, duration: float, queries: int) -> None:
+        with self._lock:
+            self._snapshots += 1
+            self._snapshot_time += duration
+            self._snapshot_queries += queries
+
+    def diff(self, duration: float, fields_compared: int) -> None:
+        with self._lock:
+            self._diffs += 1
+            self._diff_time += duration
+            self._fields_compared += fields_compared
+
+    def dispatch(self, sender: type[Any], receiver: Callable[..., Any], duration: float) -> None:
+        name = _receiver_name(receiver)
+        with self._lock:
+            self._dispatches[name] = self._dispatches.get(name, 0) + 1
+            self._dispatch_time[name] = self._dispatch_time.get(name, 0.0) + duration
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns the totals so far. ``dispatches`` and ``dispatch_time`` map
+        the dotted path of each receiver to its number of calls and total
+        time.
+        """
+        with self._lock:
+            return {
+                "snapshots": self._snapshots,
+                "snapshot_time": self._snapshot_time,
+                "snapshot_queries": self._snapshot_queries,
+                "diffs": self._diffs,
+                "diff_time": self._diff_time,
+                "fields_compared": self._fields_compared,
+                "dispatches": dict(self._dispatches),
+                "dispatch_time": dict(self._dispatch_time),
+            }
+
+
+class LoggingHook(Hook):
+    """
+    Logs every measurement to the ``django_model_changes.instrumentation``
+    logger at ``DEBUG`` level.
+    """
+
+    def snapshot(self, instance: ChangesMixin, duration: float, queries: int) -> None:
+        logger.debug(
+            "Snapshot of %s %s took %.6fs and %d queries",
+            instance._meta.label,
+            instance.pk,
+            duration,
+            queries,
+        )
+
+    def diff(self, duration: float, fields_compared: int) -> None:
+        logger.debug("Diff of %d fields took %.6fs", fields_compared, duration)
+
+    def dispatch(self, sender: type[Any], receiver: Callable[..., Any], duration: float) -> None:
+        logger.debug(
+            "post_change receiver %s for %s took %.6fs",
+            _receiver_name(receiver),
+            sender._meta.label,
+            duration,
+        )
+
+
+# Active hooks, changed in place so that modules importing the list see
+# hooks added later.
+_hooks: list[Hook] = []
+_lock = threading.Lock()
+
+
+def add_hook(hook: Hook) -> None:
+    with _lock:
+        _hooks.append(hook)
+
+
+def remove_hook(hook: Hook) -> None:
+    with _lock:
+        _hooks.remove(hook)
+
+
+@contextmanager
+def instrument(*hooks: Hook) -> Iterator[None]:
+    """
+    Adds the hooks for the duration of the block.
+    """
+    for hook in hooks:
+        add_hook(hook)
+    try:
+        yield
+    finally:
+        for hook in hooks:
+            remove_hook(hook)
+
+
+def timed_snapshot(instance: ChangesMixin, snapshot: Callable[..., State], *args: Any) -> State:
+    """
+    Returns ``snapshot(*args)``, reporting its duration and the number of
+    queries it ran to the hooks.
+    """
+    queries = 0
+
+    def count(execute: Callable[..., Any], *args: Any) -> Any:
+        nonlocal queries
+        queries += 1
+        return execute(*args)
+
+    connection = connections[instance._state.db or DEFAULT_DB_ALIAS]
+    start = time.perf_counter()
+    with connection.execute_wrapper(count):
+        state = snapshot(*args)
+    duration = time.perf_counter() - start
+    for hook in list(_hooks):
+        hook.snapshot(instance, duration, queries)
+    return state
+
+
+def timed_diff(
+    diff: Callable[..., dict[str, tuple[Any, Any]]], values: Any, *args: Any
+) -> dict[str, tuple[Any, Any]]:
+    """
+    Returns ``diff(values, *args)``, reporting its duration and the number
+    of values compared to the hooks.
+    """
+    values = list(values)
+    start = time.perf_counter()
+    result = diff(values, *args)
+    duration = time.perf_counter() - start
+    for hook in list(_hooks):
+        hook.diff(duration, len(values))
+    return result
+
+
+class InstrumentedSignal(Signal):
+    """
+    Signal whose receivers are timed while hooks are active. Receivers are
+    still called by ``Signal.send()`` and ``Signal.asend()``, coroutine
+    receivers concurrently.
+    """
+
+    def _live_receivers(self, sender: Any) -> tuple[list[Any], list[Any]]:
+        sync_receivers, async_receivers = super()._live_receivers(sender)
+        if not _hooks:
+            return sync_receivers, async_receivers
+        return (
+            [_timed_receiver(sender, receiver) for receiver in sync_receivers],
+            [_timed_async_receiver(sender, receiver) for receiver in async_receivers],
+        )
+
+
+def _timed_receiver(sender: Any, receiver: Callable[..., Any]) -> Callable[..., Any]:
+    @wraps(receiver)
+    def timed(*args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        response = receiver(*args, **kwargs)
+        _report_dispatch(sender, receiver, time.perf_counter() - start)
+        return response
+
+    return timed
+
+
+def _timed_async_receiver(sender: Any, receiver: Callable[..., Any]) -> Callable[..., Any]:
+    @wraps(receiver)
+    async def timed(*args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        response = await receiver(*args, **kwargs)
+        _report_dispatch(sender, receiver, time.perf_counter() - start)
+        return response
+
+    return timed
+
+
+def _report_dispatch(sender: Any, receiver: Callable[..., Any], duration: float) -> None:
+    for hook in list(_hooks):
+        hook.dispatch(sender, receiver, duration)
+
+
+def _receiver_name(receiver: Callable[..., Any]) -> str:
+    module = getattr(receiver, "__module__", None)
+    name = getattr(receiver, "__qualname__", None) or type(receiver).__qualname__
+    return f"{module}.{name}" if module else name
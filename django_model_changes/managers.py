@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+from django.db import connections, models
+
+from .changes import SAVE, UNKNOWN, ChangesMixin, State, _diff
+from .context import DISPATCH, SNAPSHOTS, suspended, untracked
+from .payload import ChangePayload
+from .signals import post_change_bulk
+
+
+class ChangesQuerySet(models.QuerySet):
+    """
+    QuerySet that records changes for instances written by its bulk
+    operations, which do not send ``post_save``.
+
+    Use as the manager of a model with ``ChangesMixin``::
+
+        class User(ChangesMixin, models.Model):
+            objects = ChangesManager()
+
+    After ``bulk_create()``, ``bulk_update()`` and ``update()`` the state of
+    every affected instance is recorded without sending ``post_change`` and
+    ``post_change_bulk`` is sent once for the whole operation.
+    """
+
+    def bulk_create(self, objs: Iterable[Any], *args: Any, **kwargs: Any) -> list[Any]:
+        objs = super().bulk_create(objs, *args, **kwargs)
+        _record_bulk(self.model, objs)
+        return objs
+
+    def bulk_update(
+        self, objs: Iterable[Any], fields: Sequence[str], *args: Any, **kwargs: Any
+    ) -> int:
+        objs = list(objs)
+        # Django writes the rows with update(), which would fetch them again
+        # and send another post_change_bulk. Their changes are recorded here.
+        using = self._db  # type: ignore[attr-defined]
+        plain = models.QuerySet(self.model, query=self.query.chain(), using=using)
+        rows = plain.bulk_update(objs, fields, *args, **kwargs)
+        _record_bulk(self.model, objs, update_fields=fields)
+        return rows
+
+    def update(self, **kwargs: Any) -> int:
+        """
+        Updates all rows like ``QuerySet.update()``.
+
+        If ``post_change_bulk`` has receivers, the tracked columns of the
+        affected rows are fetched with one query before the update, and the
+        rows are sent as instances with their tracked fields loaded and the
+        states before and after the update recorded. Related objects are not
+        fetched, their changes are only recorded under the attname of the
+        field, e.g. ``user_id``. If any of the new values is an expression,
+        such as ``F("count") + 1``, the updated values are fetched with one
+        more query per batch of rows.
+
+        The values of every affected row are kept until the signal is sent,
+        update large tables in chunks or inside ``suspend_tracking()``.
+        Without receivers, nothing is fetched.
+        """
+        model = self.model
+        if suspended.get() & (SNAPSHOTS | DISPATCH) or not post_change_bulk.has_listeners(model):
+            return super().update(**kwargs)
+        plan = model._get_field_plan()
+        before = list(self.values_list(*plan.attnames))
+        rows = super().update(**kwargs)
+        if not before:
+            return rows
+
+        meta = model._meta
+        after = [list(row) for row in before]
+        expressions = []
+        for name, value in kwargs.items():
+            field = meta.get_field(name)
+            if field.attname not in plan.index:
+                continue
+            if hasattr(value, "resolve_expression"):
+                expressions.append(field.attname)
+                continue
+            if isinstance(value, models.Model):
+                # A related object may also be given by its primary key.
+                value = getattr(value, field.target_field.attname)
+            i = plan.index[field.attname]
+            for row in after:
+                row[i] = value
+        if expressions:
+            _fetch_updated(model, self.db, after, expressions)
+
+        instances = _updated_instances(model, self.db, before, [tuple(row) for row in after])
+        _record_bulk(model, instances, recorded=True)
+        return rows
+
+    def changed_against_db(
+        self, instances: Iterable[ChangesMixin], batch_size: int | None = None
+    ) -> dict[Any, dict[str, tuple[Any, Any]] | None]:
+        """
+        Compares instances with their rows in this queryset, see
+        ``changed_against_db()``.
+        """
+        return changed_against_db(instances, batch_size, queryset=self)
+
+
+ChangesManager = models.Manager.from_queryset(ChangesQuerySet)
+
+
+def _record_bulk(
+    sender: type[models.Model],
+    instances: Sequence[ChangesMixin],
+    update_fields: Iterable[str] | None = None,
+    recorded: bool = False,
+) -> None:
+    flags = suspended.get()
+    if flags & SNAPSHOTS:
+        return
+    # Instances created by untracked() have no states.
+    instances = [instance for instance in instances if "_states" in instance.__dict__]
+    if not recorded:
+        for instance in instances:
+            instance._save_state(event_type=SAVE, update_fields=update_fields, send_signal=False)
+    if instances and not flags & DISPATCH and post_change_bulk.has_listeners(sender):
+        changes = [instance.previous_changes() for instance in instances]
+        post_change_bulk.send(
+            sender=sender,
+            instances=list(instances),
+            changes=changes,
+            payloads=[ChangePayload(*pair) for pair in zip(instances, changes, strict=True)],
+        )
+
+
+def _fetch_updated(
+    model: type[ChangesMixin], using: str, rows: list[list[Any]], attnames: Sequence[str]
+) -> None:
+    # Replaces the values of attnames in rows, in the order of
+    # _FieldPlan.attnames, by the values in the database.
+    plan = model._get_field_plan()
+    pk_field = model._meta.pk
+    if pk_field is None:
+        return
+    pk_index = plan.index[pk_field.attname]
+    indexes = [plan.index[attname] for attname in attnames]
+    manager: models.Manager[Any] = model._base_manager  # type: ignore[attr-defined]
+    batch_size = connections[using].ops.bulk_batch_size([pk_field], rows)
+    for start in range(0, len(rows), batch_size):
+        batch = {row[pk_index]: row for row in rows[start : start + batch_size]}
+        for pk, *values in (
+            manager.using(using).filter(pk__in=list(batch)).values_list("pk", *attnames)
+        ):
+            row = batch[pk]
+            for i, value in zip(indexes, values):
+                row[i] = value
+
+
+def _updated_instances(
+    model: type[ChangesMixin],
+    using: str,
+    before: Sequence[tuple[Any, ...]],
+    after: Sequence[tuple[Any, ...]],
+) -> list[ChangesMixin]:
+    # Builds instances from the tracked values of rows after an update, with
+    # the states before and after the update recorded. Related objects are
+    # not fetched, their values in the states are UNKNOWN.
+    plan = model._get_field_plan()
+    # Model.from_db() takes the loaded values in the order of the concrete
+    # fields.
+    order = sorted(range(len(plan.attnames)), key=plan.raw_indexes.__getitem__)
+    attnames = [plan.attnames[i] for i in order]
+    index = plan.index
+    unknowns: tuple[Any, ...] = ()
+    if plan.aliases and model.track_related_objects:
+        index = plan.related_index
+        unknowns = (UNKNOWN,) * len(plan.aliases)
+    from_db = model.from_db  # type: ignore[attr-defined]
+    instances = []
+    with untracked():
+        for values_before, values_after in zip(before, after, strict=True):
+            instance = from_db(using, attnames, [values_after[i] for i in order])
+            if plan.copies:
+                values_before = plan.copy(values_before)
+                values_after = plan.copy(values_after)
+            instance._start_tracking(
+                [State(index, values_before + unknowns), State(index, values_after + unknowns)]
+            )
+            instances.append(instance)
+    return instances
+
+
+def changed_against_db(
+    instances: Iterable[ChangesMixin],
+    batch_size: int | None = None,
+    queryset: models.QuerySet[Any] | None = None,
+) -> dict[Any, dict[str, tuple[Any, Any]] | None]:
+    """
+    Compares instances of a model with their rows in the database, fetching
+    the rows of up to ``batch_size`` instances per query instead of calling
+    ``refresh_from_db()`` on each.
+
+    Returns a ``pk -> {attname: (database value, current value)}`` dict for
+    the instances whose tracked fields differ from their row, and
+    ``pk -> None`` for instances whose row is missing, e.g. deleted or
+    excluded by ``queryset``. Unsaved instances and deferred fields are
+    ignored.
+
+    Examples::
+
+        >>> changed_against_db(users)
+        {1: {'name': ('Foo Bar', 'My Real Name')}, 7: None}
+    """
+    instances = [instance for instance in instances if instance.pk is not None]
+    if not instances:
+        return {}
+    model = type(instances[0])
+    plan = model._get_field_plan()
+    pk_field = model._meta.pk
+    if pk_field is None:
+        return {}
+    if queryset is None:
+        manager: models.Manager[Any] = model._base_manager  # type: ignore[attr-defined]
+        queryset = manager.using(instances[0]._state.db)
+    if batch_size is None:
+        batch_size = connections[queryset.db].ops.bulk_batch_size([pk_field], instances)
+    pk_index = plan.index[pk_field.attname]
+
+    changed: dict[Any, dict[str, tuple[Any, Any]] | None] = {}
+    for start in range(0, len(instances), batch_size):
+        batch = instances[start : start + batch_size]
+        rows = {
+            row[pk_index]: row
+            for row in queryset.filter(pk__in=[instance.pk for instance in batch]).values_list(
+                *plan.attnames
+            )
+        }
+        for instance in batch:
+            row = rows.get(instance.pk)
+            if row is None:
+                changed[instance.pk] = None
+                continue
+            loaded = instance.__dict__
+            diff = _diff(
+                (
+                    (attname, value, getattr(instance, attname) if attname in loaded else UNKNOWN)
+                    for attname, value in zip(plan.attnames, row)
+                ),
+                plan.comparators,
+            )
+            if diff:
+                changed[instance.pk] = diff
+    return changed
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+
+class ChangeLogQuerySet(models.QuerySet["ChangeLog"]):
+    def for_object(self, instance: models.Model) -> ChangeLogQuerySet:
+        """
+        Returns the change log entries of an instance, oldest first.
+        """
+        return self.filter(model=instance._meta.label, object_pk=str(instance.pk)).order_by(
+            "timestamp", "pk"
+        )
+
+
+class ChangeLogManager(models.Manager["ChangeLog"]):
+    def get_queryset(self) -> ChangeLogQuerySet:
+        return ChangeLogQuerySet(self.model, using=self._db)
+
+    def for_object(self, instance: models.Model) -> ChangeLogQuerySet:
+        return self.get_queryset().for_object(instance)
+
+
+class ChangeLog(models.Model):
+    """
+    A change recorded for an instance by ``ChangeLogRecorder``.
+
+    Requires ``"django_model_changes"`` in ``INSTALLED_APPS``.
+    """
+
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+    ACTION_CHOICES = [(CREATE, "Create"), (UPDATE, "Update"), (DELETE, "Delete")]
+
+    model = models.CharField(max_length=255, help_text="Label of the model, e.g. app.Model.")
+    object_pk = models.CharField(max_length=255)
+    action = models.CharField(max_length=6, choices=ACTION_CHOICES)
+    changes = models.JSONField(
+        encoder=DjangoJSONEncoder, help_text="attname -> [previous value, new value]"
+    )
+    timestamp = models.DateTimeField(default=timezone.now)
+
+    objects = ChangeLogManager()
+
+    class Meta:
+        indexes = [models.Index(fields=["model", "object_pk"])]
+
+    def __str__(self) -> str:
+        return f"{self.action} {self.model} {self.object_pk}"
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import base64
+import json
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils.duration import duration_iso_string
+
+from .comparators import UNAVAILABLE
+
+if TYPE_CHECKING:
+    from .changes import ChangesMixin, _FieldPlan
+
+Encoder = Callable[[Any], Any]
+
+
+def _isoformat(value: Any) -> Any:
+    return value.isoformat()
+
+
+def _binary(value: Any) -> Any:
+    return base64.b64encode(bytes(value)).decode("ascii")
+
+
+_json_encoder = DjangoJSONEncoder()
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, str | int | float | list | dict):
+        return value
+    try:
+        return _json_encoder.default(value)
+    except TypeError:
+        return str(value)
+
+
+_encoders: dict[type[models.Field[Any, Any]], Encoder | None] = {
+    models.BooleanField: None,
+    models.CharField: None,
+    models.FloatField: None,
+    models.IntegerField: None,
+    models.JSONField: None,
+    models.TextField: None,
+    models.DateField: _isoformat,
+    models.DateTimeField: _isoformat,
+    models.TimeField: _isoformat,
+    models.DecimalField: str,
+    models.UUIDField: str,
+    models.DurationField: duration_iso_string,
+    models.BinaryField: _binary,
+}
+
+
+def register_encoder(field_class: type[models.Field[Any, Any]], encoder: Encoder | None) -> None:
+    """
+    Uses ``encoder`` to convert the non-``None`` values of ``field_class``
+    and its subclasses to JSON-serializable values in ``ChangePayload``, or
+    passes them as is if ``encoder`` is ``None``. Register encoders before
+    the first payload of a model using the field is built::
+
+        >>> register_encoder(PointField, lambda point: point.coords)
+    """
+    _encoders[field_class] = encoder
+
+
+def get_encoder(field: models.Field[Any, Any]) -> Encoder | None:
+    """
+    Returns the encoder for the values of ``field``. Foreign keys use the
+    encoder of the field they point to, fields without a registered encoder
+    fall back to ``DjangoJSONEncoder``.
+    """
+    if isinstance(field, models.ForeignKey):
+        return get_encoder(field.target_field)
+    for cls in type(field).__mro__:
+        if cls in _encoders:
+            return _encoders[cls]
+    return _default
+
+
+class _ModelEncoder:
+    """
+    The encoders of the tracked fields of a model, built on the first payload
+    of the model.
+    """
+
+    def __init__(self, plan: _FieldPlan) -> None:
+        # Kept to detect a new plan, built when the model's fields change.
+        self.plan = plan
+        meta = plan.meta
+        fields = {f.attname: f for f in meta.concrete_fields}
+        # Attname -> encoder, None for values that are passed as is. Related
+        # objects are left out, their changes are under the attname.
+        self.encoders = {attname: get_encoder(fields[attname]) for attname in plan.attnames}
+        self.pk_encoder = get_encoder(meta.pk) if meta.pk is not None else None
+
+    def changes(self, changes: dict[str, tuple[Any, Any]]) -> dict[str, list[Any]]:
+        encoders = self.encoders
+        result: dict[str, list[Any]] = {}
+        for key, (old, new) in changes.items():
+            if key not in encoders:
+                continue
+            encoder = encoders[key]
+            if old is UNAVAILABLE:
+                old = None
+            if new is UNAVAILABLE:
+                new = None
+            if encoder is not None:
+                if old is not None:
+                    old = encoder(old)
+                if new is not None:
+                    new = encoder(new)
+            result[key] = [old, new]
+        return result
+
+
+# Model -> encoder of its tracked fields.
+_model_encoders: dict[type[ChangesMixin], _ModelEncoder] = {}
+
+
+def _get_model_encoder(model: type[ChangesMixin]) -> _ModelEncoder:
+    plan = model._get_field_plan()
+    encoder = _model_encoders.get(model)
+    if encoder is None or encoder.plan is not plan:
+        encoder = _model_encoders[model] = _ModelEncoder(plan)
+    return encoder
+
+
+class ChangePayload:
+    """
+    The changes of an instance in a form that can be serialized to JSON,
+    sent to ``post_change`` receivers as ``payload``.
+
+    Changes are keyed by attname only, e.g. ``user_id`` and not ``user``,
+    and values are converted by field type: dates and times to ISO 8601
+    strings, decimals and UUIDs to strings, binary data to base64 and
+    foreign keys like the primary key they point to. Unavailable values of
+    digest fields are ``None``.
+
+    Values are converted the first time they are read and the result is
+    shared by all receivers of the signal::
+
+        >>> def publish(sender, instance, payload, **kwargs):
+        >>>     broker.send("changes", payload.json)
+    """
+
+    __slots__ = ("model", "_pk", "_changes", "_encoded", "_json")
+
+    def __init__(self, instance: ChangesMixin, changes: dict[str, tuple[Any, Any]]) -> None:
+        self.model: type[ChangesMixin] = type(instance)
+        pk = instance.pk
+        pk_field = instance._meta.pk
+        if pk is None and pk_field is not None:
+            # Deleted instances have lost their primary key.
+            pk = instance.old_state()[pk_field.attname]
+        self._pk = pk
+        self._changes = changes
+        self._encoded: dict[str, list[Any]] | None = None
+        self._json: str | None = None
+
+    @property
+    def label(self) -> str:
+        return self.model._meta.label
+
+    @property
+    def pk(self) -> Any:
+        """
+        The encoded primary key, the one the instance had before it was
+        deleted for deleted instances.
+        """
+        encoder = _get_model_encoder(self.model).pk_encoder
+        if self._pk is None or encoder is None:
+            return self._pk
+        return encoder(self._pk)
+
+    @property
+    def changes(self) -> dict[str, list[Any]]:
+        """
+        Attname -> ``[old, new]`` encoded values. The dict is shared by all
+        receivers, don't change it.
+        """
+        if self._encoded is None:
+            self._encoded = _get_model_encoder(self.model).changes(self._changes)
+        return self._encoded
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"model": self.label, "pk": self.pk, "changes": self.changes}
+
+    @property
+    def json(self) -> str:
+        """
+        ``as_dict()`` serialized to JSON.
+        """
+        if self._json is None:
+            self._json = json.dumps(self.as_dict(), separators=(",", ":"))
+        return self._json
+
+    def __repr__(self) -> str:
+        return f"<ChangePayload: {self.label} {self.pk}>"
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any
+
+from django.db import models, router, transaction
+from django.http import HttpRequest, HttpResponse
+
+from .dispatch import _on_commit_buffer
+from .models import ChangeLog
+from .payload import ChangePayload
+from .signals import post_change
+
+if TYPE_CHECKING:
+    from django.db.backends.base.base import BaseDatabaseWrapper
+
+    from .changes import ChangesMixin
+
+# Recorder -> entries buffered by buffer_change_logs()
+_buffer: ContextVar[dict[ChangeLogRecorder, list[ChangeLog]] | None] = ContextVar(
+    "django_model_changes_change_log_buffer", default=None
+)
+
+
+class ChangeLogRecorder:
+    """
+    Persists the changes of saved and deleted instances as ``ChangeLog``
+    rows.
+
+    Entries are written in batches with ``bulk_create()``:
+
+    * Changes made inside a transaction are written once it commits, and
+      dropped if it is rolled back.
+    * Changes made inside ``buffer_change_logs()``, e.g. during a request
+      handled by ``ChangeLogMiddleware``, are written when the block exits.
+    * Other changes are written right away.
+
+    Connect it once, e.g. in ``AppConfig.ready()``::
+
+        >>> recorder = ChangeLogRecorder()
+        >>> recorder.connect(sender=User)
+
+        >>> ChangeLog.objects.for_object(user)
+        <ChangeLogQuerySet [<ChangeLog: create tests.User 1>, ...]>
+    """
+
+    def __init__(self, using: str | None = None) -> None:
+        self.using = using
+
+    def connect(self, sender: type[models.Model] | None = None) -> None:
+        post_change.connect(self.receiver, sender=sender, weak=False)
+
+    def disconnect(self, sender: type[models.Model] | None = None) -> None:
+        post_change.disconnect(self.receiver, sender=sender)
+
+    def receiver(self, sender: type[models.Model], instance: ChangesMixin, **kwargs: Any) -> None:
+        payload = kwargs.get("payload")
+        if payload is None:
+            changes = kwargs.get("changes")
+            if changes is None:
+                changes = instance.previous_changes()
+            payload = ChangePayload(instance, changes)
+        pk_field = instance._meta.pk
+        if pk_field is not None and pk_field.attname not in payload.changes and instance.pk is None:
+            # Created and deleted in the changes of one transaction, the row
+            # never existed outside of it.
+            return
+        entry = self.entry(instance, payload)
+        connection = transaction.get_connection(instance._state.db)
+        if connection.in_atomic_block:
+            _pending_entries(connection, self).append(entry)
+        else:
+            self.add([entry])
+
+    def entry(self, instance: ChangesMixin, payload: ChangePayload) -> ChangeLog:
+        """
+        Returns an unsaved ``ChangeLog`` for the changes of an instance, with
+        the values encoded by its ``ChangePayload``.
+
+        The action follows the change of the primary key in the payload,
+        which may cover several saves with ``post_change_on_commit``: a key
+        set from ``None`` is a create and a key set to ``None`` a delete.
+        """
+        action = ChangeLog.UPDATE
+        pk_field = instance._meta.pk
+        if pk_field is not None and pk_field.attname in payload.changes:
+            old, new = payload.changes[pk_field.attname]
+            if old is None:
+                action = ChangeLog.CREATE
+            elif new is None:
+                action = ChangeLog.DELETE
+        return ChangeLog(
+            model=payload.label,
+            object_pk=str(payload.pk),
+            action=action,
+            changes=payload.changes,
+        )
+
+    def add(self, entries: list[ChangeLog]) -> None:
+        """
+        Writes the entries, or adds them to the current
+        ``buffer_change_logs()`` block.
+        """
+        buffer = _buffer.get()
+        if buffer is None:
+            self.write(entries)
+        else:
+            buffer.setdefault(self, []).extend(entries)
+
+    def write(self, entries: list[ChangeLog]) -> None:
+        using = self.using or router.db_for_write(ChangeLog)
+        ChangeLog.objects.using(using).bulk_create(entries)
+
+
+@contextmanager
+def buffer_change_logs() -> Iterator[None]:
+    """
+    Buffers ``ChangeLog`` entries recorded in the block and writes them with
+    one ``bulk_create()`` per recorder when the block exits.
+    """
+    if _buffer.get() is not None:
+        yield
+        return
+    buffer: dict[ChangeLogRecorder, list[ChangeLog]] = {}
+    token = _buffer.set(buffer)
+    try:
+        yield
+    finally:
+        _buffer.reset(token)
+        for recorder, entries in buffer.items():
+            recorder.write(entries)
+
+
+class ChangeLogMiddleware:
+    """
+    Writes the ``ChangeLog`` entries recorded during a request in batches at
+    the end of the request.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        with buffer_change_logs():
+            return self.get_response(request)
+
+
+class _PendingEntries(list[ChangeLog]):
+    """
+    ``ChangeLog`` entries buffered until the transaction commits, one buffer
+    per recorder and savepoint.
+    """
+
+    def __init__(self, recorder: ChangeLogRecorder) -> None:
+        super().__init__()
+        self.recorder = recorder
+
+    def __call__(self) -> None:
+        if self:
+            self.recorder.add(list(self))
+
+
+def _pending_entries(
+    connection: BaseDatabaseWrapper, recorder: ChangeLogRecorder
+) -> _PendingEntries:
+    return _on_commit_buffer(
+        connection,
+        _PendingEntries,
+        lambda pending: pending.recorder is recorder,
+        lambda others: _PendingEntries(recorder),
+    )
@@ -1,8 +1,28 @@
 from django.dispatch import Signal
 
+from .instrumentation import InstrumentedSignal
 
-post_change = Signal()
+
+post_change = InstrumentedSignal()
 """
 Signal sent whenever an instance is saved or deleted
 and changes have been recorded.
+
+Receivers get the ``instance`` and its ``changes``, which are the
+``previous_changes()`` of the instance, or the changes of all its saves
+in the transaction if its model has ``post_change_on_commit`` enabled,
+and ``payload``, the same changes as a ``ChangePayload`` that can be
+serialized to JSON.
+"""
+
+
+post_change_bulk = Signal()
+"""
+Signal sent once per bulk operation of a ``ChangesQuerySet``
+(``bulk_create()``, ``bulk_update()`` or ``update()``) after changes
+have been recorded for all instances.
+
+Receivers get ``instances``, the list of instances, and ``changes``, the
+list of their ``previous_changes()`` in the same order, and
+``payloads``, the list of their ``ChangePayload``.
 """
@@ -10,10 +10,14 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 # Configure Django settings if not already configured
+import django
 from django.conf import settings
 
 if not settings.configured and not os.environ.get("DJANGO_SETTINGS_MODULE"):
-    settings.configure()
+    settings.configure(INSTALLED_APPS=["django_model_changes"])
+
+# The models module can only be imported once the app registry is ready.
+django.setup()
 
 from django_model_changes import __version__
 
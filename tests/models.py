@@ -1,13 +1,107 @@
+import datetime
+import uuid
+
 from django.db import models
 
-from django_model_changes import ChangesMixin
+from django_model_changes import ChangesManager, ChangesMixin
 
 
 class User(ChangesMixin, models.Model):
     name = models.CharField(max_length=100)
     flag = models.BooleanField(default=False)
 
+    objects = ChangesManager()
+
 
 class Article(ChangesMixin, models.Model):
     title = models.CharField(max_length=20)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
+
+
+class Comment(ChangesMixin, models.Model):
+    track_related_objects = False
+
+    body = models.CharField(max_length=100)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+
+
+class Note(ChangesMixin, models.Model):
+    lazy_snapshots = True
+
+    text = models.CharField(max_length=100)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+
+
+class Profile(ChangesMixin, models.Model):
+    untracked_fields = ["bio"]
+
+    name = models.CharField(max_length=100)
+    bio = models.TextField(blank=True)
+
+
+class Post(ChangesMixin, models.Model):
+    tracked_fields = ["title", "user"]
+
+    title = models.CharField(max_length=100)
+    body = models.TextField(blank=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+
+
+class Task(ChangesMixin, models.Model):
+    track_dirty_fields = True
+
+    title = models.CharField(max_length=100)
+    data = models.JSONField(default=dict)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+
+
+class LazyTask(Task):
+    lazy_snapshots = True
+
+    class Meta:
+        proxy = True
+
+
+class Ticket(ChangesMixin, models.Model):
+    post_change_on_commit = True
+
+    title = models.CharField(max_length=100)
+
+
+class Draft(ChangesMixin, models.Model):
+    history_depth = 4
+
+    title = models.CharField(max_length=100)
+
+
+class ProxyUser(User):
+    class Meta:
+        proxy = True
+
+
+class Member(User):
+    role = models.CharField(max_length=100)
+
+
+class Document(ChangesMixin, models.Model):
+    digest_fields = ["body", "payload"]
+
+    title = models.CharField(max_length=100)
+    body = models.TextField(blank=True)
+    payload = models.JSONField(default=dict)
+
+
+class LazyDocument(Document):
+    lazy_snapshots = True
+
+    class Meta:
+        proxy = True
+
+
+class Invoice(ChangesMixin, models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    total = models.DecimalField(max_digits=10, decimal_places=2)
+    issued = models.DateTimeField()
+    term = models.DurationField(default=datetime.timedelta(days=30))
+    raw = models.BinaryField(default=b"")
@@ -5,6 +5,7 @@ DATABASES = {
 }
 
 INSTALLED_APPS = [
+    "django_model_changes",
     "tests",
 ]
 
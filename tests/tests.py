@@ -1,6 +1,57 @@
-from django.test import TestCase
+import asyncio
+import datetime
+import decimal
+import json
+import threading
+from unittest import mock
 
-from .models import User, Article
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import signals
+from django.db.models import F
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import isolate_apps
+
+from django_model_changes import (
+    UNAVAILABLE,
+    UNKNOWN,
+    CacheInvalidator,
+    ChangeEvent,
+    ChangePayload,
+    ChangesMixin,
+    ChangesQuerySet,
+    Comparator,
+    State,
+    ThreadedDispatcher,
+    changed_against_db,
+    post_change,
+    post_change_bulk,
+    register_comparator,
+    register_encoder,
+    suspend_tracking,
+    untracked,
+)
+from django_model_changes.instrumentation import StatsCollector, instrument
+from django_model_changes.models import ChangeLog
+from django_model_changes.recorder import ChangeLogRecorder, buffer_change_logs
+
+from .models import (
+    Article,
+    Comment,
+    Document,
+    Draft,
+    Invoice,
+    LazyDocument,
+    LazyTask,
+    Member,
+    Note,
+    Post,
+    Profile,
+    ProxyUser,
+    Task,
+    Ticket,
+    User,
+)
 
 
 class ChangesMixinBeforeAndCurrentTestCase(TestCase):
@@ -183,3 +234,1483 @@ class ChangesMixinBeforeAndCurrentTestCase(TestCase):
         self.assertDictContainsSubset(
             {"id": article.pk, "user_id": you.pk}, article.current_state()
         )
+
+
+class TrackRelatedObjectsTestCase(TestCase):
+    def setUp(self):
+        self.me = User.objects.create(name="me")
+        self.you = User.objects.create(name="you")
+
+    def test_iteration_does_not_fetch_related_objects(self):
+        Comment.objects.bulk_create([Comment(body=str(i), user=self.me) for i in range(500)])
+
+        with self.assertNumQueries(1):
+            comments = list(Comment.objects.all())
+
+        self.assertEqual(500, len(comments))
+
+    def test_state_contains_attnames_only(self):
+        comment = Comment.objects.create(body="Hello", user=self.me)
+        comment = Comment.objects.get(pk=comment.pk)
+
+        with self.assertNumQueries(0):
+            state = comment.current_state()
+
+        self.assertEqual({"id": comment.pk, "body": "Hello", "user_id": self.me.pk}, state)
+
+    def test_foreign_key_changes(self):
+        comment = Comment.objects.create(body="Hello", user=self.me)
+        comment.user = self.you
+
+        self.assertEqual({"user_id": (self.me.pk, self.you.pk)}, comment.changes())
+
+        comment.save()
+
+        self.assertEqual({"user_id": (self.me.pk, self.you.pk)}, comment.previous_changes())
+
+
+class DeferredFieldsTestCase(TestCase):
+    def setUp(self):
+        for i in range(100):
+            User.objects.create(name=str(i))
+
+    def test_deferred_fields_are_not_loaded(self):
+        with self.assertNumQueries(1):
+            users = list(User.objects.only("id"))
+
+        with self.assertNumQueries(0):
+            for user in users:
+                self.assertEqual(UNKNOWN, user.previous_state()["name"])
+                self.assertEqual({}, user.changes())
+
+    def test_field_loaded_later_is_not_a_change(self):
+        user = User.objects.defer("name").get(name="1")
+
+        self.assertEqual("1", user.name)
+        self.assertEqual({}, user.changes())
+
+    def test_save_records_loaded_value(self):
+        user = User.objects.defer("name").get(name="1")
+        user.name = "Foo Bar"
+        user.save()
+
+        self.assertEqual(UNKNOWN, user.old_state()["name"])
+        self.assertEqual("Foo Bar", user.previous_state()["name"])
+
+        user.name = "My Real Name"
+
+        self.assertEqual({"name": ("Foo Bar", "My Real Name")}, user.changes())
+
+    def test_old_instance_keeps_unknown_fields_deferred(self):
+        user = User.objects.only("id").get(name="1")
+        old_user = user.old_instance()
+
+        assert isinstance(old_user, User)
+        self.assertEqual({"name", "flag"}, old_user.get_deferred_fields())
+
+
+class StateInstancesTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(name="Foo Bar")
+        self.other = User.objects.create(name="Other")
+
+    def test_previous_instance(self):
+        article = Article.objects.create(title="a", user=self.user)
+        article.title = "b"
+        article.user = self.other
+        article.save()
+
+        with self.assertNumQueries(0):
+            old = article.old_instance()
+            self.assertEqual(("a", self.user), (old.title, old.user))
+            previous = article.previous_instance()
+            self.assertEqual(("b", self.other), (previous.title, previous.user))
+            self.assertEqual({}, old.changes())
+
+        self.assertFalse(old._state.adding)
+
+    def test_new_instance(self):
+        old = User(name="Foo Bar").old_instance()
+
+        assert isinstance(old, User)
+        self.assertTrue(old._state.adding)
+        self.assertEqual((None, "Foo Bar"), (old.pk, old.name))
+
+    def test_post_init(self):
+        instances = []
+
+        def receiver(sender, instance, **kwargs):
+            instances.append(instance)
+
+        signals.post_init.connect(receiver, sender=User)
+        try:
+            old = self.user.old_instance()
+        finally:
+            signals.post_init.disconnect(receiver, sender=User)
+
+        self.assertEqual(1, len(instances))
+        self.assertIs(old, instances[0])
+
+    def test_read_only(self):
+        old = self.user.old_instance()
+
+        with self.assertRaises(TypeError):
+            old.save()
+        with self.assertRaises(TypeError):
+            old.delete()
+
+
+class LazySnapshotsTestCase(TestCase):
+    def setUp(self):
+        self.me = User.objects.create(name="me")
+        self.you = User.objects.create(name="you")
+        Note.objects.bulk_create([Note(text=str(i), user=self.me) for i in range(100)])
+
+    def test_iteration_takes_no_snapshots(self):
+        with self.assertNumQueries(1):
+            notes = list(Note.objects.all())
+
+        for note in notes:
+            self.assertEqual([], note._states)
+
+    def test_snapshot_on_read(self):
+        note = Note.objects.get(text="1")
+
+        self.assertEqual("1", note.previous_state()["text"])
+        self.assertEqual(self.me, note.previous_state()["user"])
+        self.assertEqual({}, note.changes())
+
+    def test_snapshot_before_first_assignment(self):
+        note = Note.objects.get(text="1")
+        note.text = "Hello"
+        note.user = self.you
+
+        self.assertEqual(
+            {
+                "text": ("1", "Hello"),
+                "user": (self.me, self.you),
+                "user_id": (self.me.pk, self.you.pk),
+            },
+            note.changes(),
+        )
+
+    def test_save(self):
+        note = Note.objects.get(text="1")
+        note.text = "Hello"
+        note.save()
+
+        self.assertEqual({"text": ("1", "Hello")}, note.previous_changes())
+        self.assertEqual({}, note.changes())
+
+    def test_in_place_edit(self):
+        Task.objects.create(title="Hello", user=self.me)
+        task = LazyTask.objects.get()
+        task.data["key"] = "value"
+
+        self.assertEqual({"data": ({}, {"key": "value"})}, task.changes())
+
+    def test_in_place_edit_of_digest_field(self):
+        Document.objects.create(title="a")
+        document = LazyDocument.objects.get()
+        document.payload["key"] = "value"
+
+        self.assertEqual({"payload": (UNAVAILABLE, {"key": "value"})}, document.changes())
+
+
+class FieldPlanTestCase(TestCase):
+    def test_plan_is_cached(self):
+        self.assertIs(User._get_field_plan(), User._get_field_plan())
+        self.assertEqual(("id", "title", "user_id"), Article._get_field_plan().attnames)
+        self.assertEqual({"user": "user_id"}, Article._get_field_plan().aliases)
+
+    @isolate_apps("tests")
+    def test_plan_follows_field_changes(self):
+        class Temporary(ChangesMixin, models.Model):
+            name = models.CharField(max_length=100)
+
+        plan = Temporary._get_field_plan()
+        models.IntegerField(default=0).contribute_to_class(Temporary, "extra")
+
+        self.assertIsNot(plan, Temporary._get_field_plan())
+        self.assertEqual({"id": None, "name": "", "extra": 0}, Temporary().current_state())
+
+
+class SignalRegistrationTestCase(TestCase):
+    def setUp(self):
+        self.calls = []
+        post_change.connect(self.receiver)
+
+    def tearDown(self):
+        post_change.disconnect(self.receiver)
+
+    def receiver(self, sender, instance, changes, **kwargs):
+        self.calls.append((sender, changes))
+
+    def test_registered_when_prepared(self):
+        self.assertTrue(signals.post_save.has_listeners(User))
+        self.assertTrue(signals.post_delete.has_listeners(User))
+
+    @isolate_apps("tests", "django_model_changes")
+    def test_same_model_name_in_other_app(self):
+        class User(ChangesMixin, models.Model):
+            class Meta:
+                app_label = "django_model_changes"
+
+        self.assertTrue(signals.post_save.has_listeners(User))
+        self.assertTrue(signals.post_delete.has_listeners(User))
+
+    def test_proxy(self):
+        user = ProxyUser.objects.create(name="Foo Bar")
+        user.name = "My Real Name"
+        user.save()
+
+        self.assertEqual([ProxyUser, ProxyUser], [sender for sender, _ in self.calls])
+        self.assertEqual({"name": ("Foo Bar", "My Real Name")}, self.calls[-1][1])
+
+    def test_multi_table_inheritance(self):
+        member = Member.objects.create(name="Foo Bar", role="a")
+        member.role = "b"
+        member.save()
+
+        self.assertEqual([Member, Member], [sender for sender, _ in self.calls])
+        self.assertEqual({"role": ("a", "b")}, self.calls[-1][1])
+
+
+class MultiTableInheritanceTestCase(TestCase):
+    def setUp(self):
+        Member.objects.create(name="Foo Bar", role="a")
+        self.member = Member.objects.get()
+
+    def test_parent_fields(self):
+        self.member.name = "My Real Name"
+        self.member.role = "b"
+
+        self.assertEqual(
+            {"name": ("Foo Bar", "My Real Name"), "role": ("a", "b")}, self.member.changes()
+        )
+        self.assertEqual(
+            {
+                "tests_user": {"name": ("Foo Bar", "My Real Name")},
+                "tests_member": {"role": ("a", "b")},
+            },
+            self.member.changes_by_table(),
+        )
+
+    def test_save_changed_skips_unchanged_tables(self):
+        self.member.role = "b"
+        with self.assertNumQueries(1):
+            self.member.save_changed()
+
+        self.member.name = "My Real Name"
+        with self.assertNumQueries(1):
+            self.member.save_changed()
+
+        self.assertEqual(("My Real Name", "b"), Member.objects.values_list("name", "role").get())
+
+
+class CaseInsensitiveField(models.CharField):
+    pass
+
+
+class CaseInsensitiveComparator(Comparator):
+    def equal(self, a, b):
+        return a.lower() == b.lower()
+
+
+register_comparator(CaseInsensitiveField, CaseInsensitiveComparator())
+
+
+class ComparatorsTestCase(TestCase):
+    def setUp(self):
+        self.task = Task.objects.create(title="Hello", user=User.objects.create(name="me"))
+
+    def test_in_place_edit(self):
+        self.task.data["key"] = "value"
+
+        self.assertEqual({"data": ({}, {"key": "value"})}, self.task.changes())
+        self.assertTrue(self.task.has_changed("data"))
+
+    def test_recorded_values_are_copies(self):
+        self.task.data["key"] = "value"
+        self.task.save()
+        self.task.data["key"] = "other"
+
+        self.assertEqual({"key": "value"}, self.task.previous_state()["data"])
+        self.assertEqual({"key": "value"}, self.task.previous_instance().data)
+        self.assertEqual({"data": ({"key": "value"}, {"key": "other"})}, self.task.changes())
+
+    @isolate_apps("tests")
+    def test_registered_comparator(self):
+        class Tag(ChangesMixin, models.Model):
+            name = CaseInsensitiveField(max_length=100)
+
+        tag = Tag(name="django")
+        tag.name = "Django"
+        self.assertEqual({}, tag.changes())
+
+        tag.name = "Flask"
+        self.assertEqual({"name": ("django", "Flask")}, tag.changes())
+
+
+class DigestFieldsTestCase(TestCase):
+    def setUp(self):
+        Document.objects.create(title="a", body="x" * 10_000, payload={"key": "value"})
+        self.document = Document.objects.get()
+
+    def test_states_only_record_digests(self):
+        state = self.document.previous_state()
+
+        self.assertNotIn("x" * 10_000, state.values())
+        self.assertEqual("a", state["title"])
+
+    def test_unchanged(self):
+        self.document.body = "x" * 10_000
+        self.document.payload = {"key": "value"}
+
+        self.assertEqual({}, self.document.changes())
+
+    def test_changed(self):
+        self.document.body = "y"
+        self.document.payload["key"] = "other"
+
+        self.assertEqual(
+            {"body": (UNAVAILABLE, "y"), "payload": (UNAVAILABLE, {"key": "other"})},
+            self.document.changes(),
+        )
+
+        self.document.save()
+
+        self.assertEqual(
+            {"body": (UNAVAILABLE, UNAVAILABLE), "payload": (UNAVAILABLE, UNAVAILABLE)},
+            self.document.previous_changes(),
+        )
+        self.assertEqual(
+            {"body", "payload"}, self.document.previous_instance().get_deferred_fields()
+        )
+
+
+class StateTestCase(TestCase):
+    def test_state_is_read_only_mapping(self):
+        user = User(name="Foo Bar")
+        state = user.previous_state()
+
+        self.assertIsInstance(state, State)
+        self.assertEqual({"id": None, "name": "Foo Bar", "flag": False}, state)
+        self.assertEqual({"id": None, "name": "Foo Bar", "flag": False}, dict(state))
+        self.assertEqual("Foo Bar", state["name"])
+        self.assertEqual("Foo Bar", state.get("name"))
+        self.assertIsNone(state.get("missing"))
+        self.assertIn("name", state)
+        self.assertEqual(3, len(state))
+        self.assertEqual("{'id': None, 'name': 'Foo Bar', 'flag': False}", repr(state))
+        with self.assertRaises(TypeError):
+            state["name"] = "My Real Name"  # type: ignore[index]
+
+    def test_state_has_no_instance_dict(self):
+        self.assertFalse(hasattr(User().previous_state(), "__dict__"))
+
+    def test_states_share_keys(self):
+        user = User.objects.create(name="Foo Bar")
+
+        self.assertIs(user.old_state()._index, user.previous_state()._index)
+
+    def test_foreign_key_state(self):
+        me = User.objects.create(name="me")
+        article = Article(title="Hello World", user=me)
+
+        self.assertEqual(me, article.previous_state()["user"])
+        self.assertEqual(me.pk, article.previous_state()["user_id"])
+
+
+class HistoryDepthTestCase(TestCase):
+    def test_default_depth(self):
+        user = User.objects.create(name="a")
+        for name in ["b", "c", "d"]:
+            user.name = name
+            user.save()
+
+        self.assertEqual(2, len(user._states))
+        self.assertEqual(user.old_state(), user.state_at(0))
+        self.assertEqual(user.previous_state(), user.state_at(1))
+        with self.assertRaises(IndexError):
+            user.state_at(2)
+
+    def test_intermediate_states(self):
+        draft = Draft.objects.create(title="a")
+        for title in ["b", "c", "d", "e"]:
+            draft.title = title
+            draft.save()
+
+        self.assertEqual(["b", "c", "d", "e"], [draft.state_at(n)["title"] for n in range(4)])
+        self.assertEqual({"title": ("c", "d")}, draft.changes_between(1, 2))
+        self.assertEqual({"title": ("b", "e")}, draft.changes_between(0, -1))
+        self.assertEqual(draft.previous_changes(), draft.changes_between(-2, -1))
+        self.assertEqual({"title": ("d", "e")}, draft.previous_changes())
+
+    def test_invalid_depth(self):
+        with self.assertRaises(ValueError):
+
+            class Shallow(ChangesMixin):
+                history_depth = 1
+
+
+class TrackedFieldsTestCase(TestCase):
+    def test_untracked_fields(self):
+        profile = Profile.objects.create(name="Foo Bar", bio="Long story")
+        profile.name = "My Real Name"
+        profile.bio = "Longer story"
+
+        self.assertEqual({"id": profile.pk, "name": "My Real Name"}, profile.current_state())
+        self.assertEqual({"name": ("Foo Bar", "My Real Name")}, profile.changes())
+
+        profile.save()
+
+        self.assertEqual({"name": ("Foo Bar", "My Real Name")}, profile.previous_changes())
+
+    def test_has_changed_untracked_field(self):
+        profile = Profile(name="Foo Bar")
+
+        self.assertFalse(profile.has_changed("name"))
+        with self.assertRaisesMessage(ValueError, "Profile.bio is not tracked"):
+            profile.has_changed("bio")
+
+    def test_tracked_fields(self):
+        me = User.objects.create(name="me")
+        you = User.objects.create(name="you")
+        post = Post.objects.create(title="Hello", body="World", user=me)
+        post.title = "Hello World"
+        post.body = "Hello World"
+        post.user = you
+
+        self.assertEqual({"id", "title", "user", "user_id"}, set(post.current_state()))
+        self.assertEqual(
+            {
+                "title": ("Hello", "Hello World"),
+                "user": (me, you),
+                "user_id": (me.pk, you.pk),
+            },
+            post.changes(),
+        )
+
+    def test_primary_key_is_always_tracked(self):
+        post = Post(title="Hello", user=User.objects.create(name="me"))
+
+        self.assertFalse(post.was_persisted())
+        self.assertIn("id", post.current_state())
+
+
+class DirtyFieldsTestCase(TestCase):
+    def setUp(self):
+        self.me = User.objects.create(name="me")
+        self.you = User.objects.create(name="you")
+        self.task = Task.objects.create(title="Hello", user=self.me)
+
+    def test_assigned_fields_are_dirty(self):
+        task = Task.objects.get(pk=self.task.pk)
+
+        self.assertEqual(set(), task._dirty)
+
+        task.title = "Hello World"
+        task.user = self.you
+
+        self.assertEqual({"title", "user_id"}, task._dirty)
+        self.assertEqual(
+            {
+                "title": ("Hello", "Hello World"),
+                "user": (self.me, self.you),
+                "user_id": (self.me.pk, self.you.pk),
+            },
+            task.changes(),
+        )
+
+    def test_assigning_same_value_is_not_a_change(self):
+        self.task.title = "Hello"
+
+        self.assertEqual({}, self.task.changes())
+        self.assertFalse(self.task.has_changed("title"))
+
+    def test_has_changed(self):
+        self.task.title = "Hello World"
+        self.task.user = self.you
+
+        self.assertTrue(self.task.has_changed("title"))
+        self.assertTrue(self.task.has_changed("user"))
+        self.assertTrue(self.task.has_changed("user_id"))
+        self.assertFalse(self.task.has_changed("data"))
+
+    @isolate_apps("tests")
+    def test_model_setattr(self):
+        class Tag(ChangesMixin, models.Model):
+            track_dirty_fields = True
+
+            name = models.CharField(max_length=100)
+
+            def __setattr__(self, name, value):
+                if name == "name":
+                    value = value.lower()
+                super().__setattr__(name, value)
+
+        tag = Tag(name="Django")
+        tag.name = "FLASK"
+
+        self.assertEqual("flask", tag.name)
+        self.assertEqual({"name"}, tag._dirty)
+        self.assertEqual({"name": ("django", "flask")}, tag.changes())
+
+    def test_save_clears_dirty_fields(self):
+        self.task.title = "Hello World"
+        self.task.save()
+
+        self.assertEqual(set(), self.task._dirty)
+        self.assertEqual({}, self.task.changes())
+        self.assertEqual({"title": ("Hello", "Hello World")}, self.task.previous_changes())
+
+    def test_mutable_fields_are_always_compared(self):
+        # Bypasses assignment, as in-place changes to the value do.
+        vars(self.task)["data"] = {"key": "value"}
+
+        self.assertEqual({"data": ({}, {"key": "value"})}, self.task.changes())
+        self.assertTrue(self.task.has_changed("data"))
+
+    def test_has_changed_without_dirty_tracking(self):
+        user = User.objects.create(name="Foo Bar")
+        user.name = "My Real Name"
+
+        self.assertTrue(user.has_changed("name"))
+        self.assertFalse(user.has_changed("flag"))
+
+
+class SaveChangedTestCase(TestCase):
+    def setUp(self):
+        self.me = User.objects.create(name="me")
+        self.you = User.objects.create(name="you")
+
+    def test_saves_changed_fields_only(self):
+        user = User.objects.get(pk=self.me.pk)
+        user.name = "Foo Bar"
+
+        with self.assertNumQueries(1) as context:
+            self.assertTrue(user.save_changed())
+
+        sql = context.captured_queries[0]["sql"]
+        self.assertIn('SET "name"', sql)
+        self.assertNotIn('"flag"', sql)
+        self.assertEqual({"name": ("me", "Foo Bar")}, user.previous_changes())
+        self.assertEqual("Foo Bar", User.objects.get(pk=user.pk).name)
+
+    def test_no_query_without_changes(self):
+        user = User.objects.get(pk=self.me.pk)
+
+        with self.assertNumQueries(0):
+            self.assertFalse(user.save_changed())
+
+    def test_new_instance_is_saved(self):
+        user = User(name="Foo Bar")
+
+        self.assertTrue(user.save_changed())
+        self.assertTrue(user.is_persisted())
+
+    def test_foreign_key(self):
+        comment = Comment.objects.create(body="Hello", user=self.me)
+        comment.user = self.you
+
+        with self.assertNumQueries(1) as context:
+            comment.save_changed()
+
+        self.assertIn('SET "user_id"', context.captured_queries[0]["sql"])
+        self.assertEqual(self.you, Comment.objects.get(pk=comment.pk).user)
+
+    def test_update_fields(self):
+        comment = Comment.objects.create(body="Hello", user=self.me)
+        comment.body = "Hello World"
+        comment.user = self.you
+
+        with self.assertNumQueries(1) as context:
+            self.assertTrue(comment.save_changed(update_fields=["user", "id"]))
+
+        sql = context.captured_queries[0]["sql"]
+        self.assertIn('SET "user_id"', sql)
+        self.assertNotIn('"body"', sql)
+        self.assertEqual({"body": ("Hello", "Hello World")}, comment.changes())
+
+        with self.assertNumQueries(0):
+            self.assertFalse(comment.save_changed(update_fields=["user_id"]))
+
+    def test_untracked_fields_are_saved(self):
+        profile = Profile.objects.create(name="Foo Bar")
+        profile.bio = "Long story"
+        profile.save_changed()
+
+        self.assertEqual("Long story", Profile.objects.get(pk=profile.pk).bio)
+
+    def test_partial_save_keeps_unsaved_changes(self):
+        user = User.objects.get(pk=self.me.pk)
+        user.name = "Foo Bar"
+        user.flag = True
+        user.save(update_fields=["name"])
+
+        self.assertEqual("Foo Bar", user.previous_state()["name"])
+        self.assertFalse(user.previous_state()["flag"])
+        self.assertEqual({"name": ("me", "Foo Bar")}, user.previous_changes())
+        self.assertEqual({"flag": (False, True)}, user.changes())
+
+    def test_partial_save_keeps_dirty_fields(self):
+        task = Task.objects.create(title="Hello", user=self.me)
+        task.title = "Hello World"
+        task.user = self.you
+        task.save(update_fields=["user"])
+
+        self.assertEqual({"title"}, task._dirty)
+        self.assertEqual({"title": ("Hello", "Hello World")}, task.changes())
+
+
+class BulkOperationsTestCase(TestCase):
+    def setUp(self):
+        self.bulk_calls = []
+        self.calls = []
+        post_change_bulk.connect(self.bulk_receiver, sender=User)
+        post_change.connect(self.receiver, sender=User)
+
+    def tearDown(self):
+        post_change_bulk.disconnect(self.bulk_receiver, sender=User)
+        post_change.disconnect(self.receiver, sender=User)
+
+    def bulk_receiver(self, sender, instances, changes, **kwargs):
+        self.bulk_calls.append((instances, changes))
+
+    def receiver(self, sender, instance, **kwargs):
+        self.calls.append(instance)
+
+    def test_bulk_create(self):
+        users = User.objects.bulk_create([User(name="Foo"), User(name="Bar")])
+
+        self.assertEqual([], self.calls)
+        self.assertEqual(1, len(self.bulk_calls))
+        instances, changes = self.bulk_calls[0]
+        self.assertEqual(users, instances)
+        self.assertEqual({"id": (None, users[0].pk)}, changes[0])
+        self.assertEqual({}, users[0].changes())
+
+    def test_bulk_update(self):
+        users = User.objects.bulk_create([User(name="Foo"), User(name="Bar")])
+        users[0].name = "Foo Bar"
+        users[1].flag = True
+        with self.assertNumQueries(1):
+            User.objects.bulk_update(users, ["name"])
+
+        self.assertEqual(2, len(self.bulk_calls))
+        instances, changes = self.bulk_calls[1]
+        self.assertEqual([{"name": ("Foo", "Foo Bar")}, {}], changes)
+        self.assertEqual({"flag": (False, True)}, users[1].changes())
+
+    def test_update(self):
+        User.objects.bulk_create([User(name="Foo"), User(name="Bar")])
+
+        with self.assertNumQueries(2):
+            rows = User.objects.filter(name="Foo").update(name="Foo Bar", flag=True)
+
+        self.assertEqual(1, rows)
+        instances, changes = self.bulk_calls[1]
+        self.assertEqual([{"name": ("Foo", "Foo Bar"), "flag": (False, True)}], changes)
+        self.assertEqual({}, instances[0].changes())
+
+    def test_update_with_expression(self):
+        User.objects.bulk_create([User(name="Foo"), User(name="Bar")])
+
+        with self.assertNumQueries(3):
+            User.objects.filter(name="Foo").update(name=F("id"))
+
+        instances, changes = self.bulk_calls[1]
+        self.assertEqual([{"name": ("Foo", str(instances[0].pk))}], changes)
+
+    def test_update_related_objects_are_not_fetched(self):
+        me = User.objects.create(name="me")
+        you = User.objects.create(name="you")
+        Article.objects.bulk_create([Article(title="a", user=me) for _ in range(20)])
+        articles = ChangesQuerySet(Article)
+        calls = []
+
+        def receiver(sender, instances, changes, **kwargs):
+            calls.append(changes)
+
+        post_change_bulk.connect(receiver, sender=Article)
+        try:
+            with self.assertNumQueries(2):
+                articles.update(title="b", user=you)
+        finally:
+            post_change_bulk.disconnect(receiver, sender=Article)
+
+        self.assertEqual([{"title": ("a", "b"), "user_id": (me.pk, you.pk)}] * 20, calls[0])
+
+    def test_update_digest_fields(self):
+        Document.objects.create(title="a", body="x" * 10_000, payload={"key": "value"})
+        calls = []
+
+        def receiver(sender, instances, changes, **kwargs):
+            calls.append((instances, changes))
+
+        post_change_bulk.connect(receiver, sender=Document)
+        try:
+            ChangesQuerySet(Document).update(body="y")
+        finally:
+            post_change_bulk.disconnect(receiver, sender=Document)
+
+        instances, changes = calls[0]
+        self.assertEqual([{"body": (UNAVAILABLE, UNAVAILABLE)}], changes)
+        self.assertNotIn("x" * 10_000, instances[0].old_state().values())
+        self.assertNotIn("y", instances[0].previous_state().values())
+
+    def test_update_without_receivers(self):
+        Article.objects.create(title="a", user=User.objects.create(name="me"))
+
+        with self.assertNumQueries(1):
+            ChangesQuerySet(Article).update(title="b")
+
+    def test_update_without_rows(self):
+        User.objects.filter(name="Nobody").update(name="Foo Bar")
+
+        self.assertEqual([], self.bulk_calls)
+
+
+class ChangedAgainstDbTestCase(TestCase):
+    def setUp(self):
+        self.users = [User.objects.create(name=str(i)) for i in range(5)]
+
+    def test_changed_and_missing(self):
+        users = list(User.objects.order_by("pk"))
+        users[0].name = "changed"
+        User.objects.filter(pk=users[1].pk).update(flag=True)
+        User.objects.filter(pk=users[2].pk).delete()
+
+        with self.assertNumQueries(2):
+            changed = changed_against_db(users + [User(name="new")], batch_size=3)
+
+        self.assertEqual(
+            {
+                users[0].pk: {"name": ("0", "changed")},
+                users[1].pk: {"flag": (True, False)},
+                users[2].pk: None,
+            },
+            changed,
+        )
+
+    def test_deferred_fields_are_ignored(self):
+        users = list(User.objects.only("id"))
+        User.objects.update(name="changed")
+
+        self.assertEqual({}, changed_against_db(users))
+
+
+class SuspendTrackingTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(name="Foo Bar")
+        self.calls = []
+        post_change.connect(self.receiver, sender=User)
+        post_change_bulk.connect(self.receiver, sender=User)
+
+    def tearDown(self):
+        post_change.disconnect(self.receiver, sender=User)
+        post_change_bulk.disconnect(self.receiver, sender=User)
+
+    def receiver(self, sender, **kwargs):
+        self.calls.append(kwargs.get("instance"))
+
+    def test_suspend_snapshots_and_dispatch(self):
+        with suspend_tracking():
+            self.user.name = "My Real Name"
+            self.user.save()
+            User.objects.filter(pk=self.user.pk).update(flag=True)
+
+        self.assertEqual([], self.calls)
+        self.assertEqual({"name": ("Foo Bar", "My Real Name")}, self.user.changes())
+
+    def test_suspend_dispatch(self):
+        with suspend_tracking(snapshots=False):
+            self.user.name = "My Real Name"
+            self.user.save()
+
+        self.assertEqual([], self.calls)
+        self.assertEqual({}, self.user.changes())
+        self.assertEqual({"name": ("Foo Bar", "My Real Name")}, self.user.previous_changes())
+
+    def test_other_threads_are_not_affected(self):
+        def save():
+            # Records a state and sends post_change, like after a save.
+            User(name="Other")._save_state()
+
+        with suspend_tracking():
+            thread = threading.Thread(target=save)
+            thread.start()
+            thread.join()
+
+        self.assertEqual(1, len(self.calls))
+
+    def test_untracked(self):
+        with untracked():
+            user = User.objects.get(pk=self.user.pk)
+
+        self.assertNotIn("_states", vars(user))
+        user.name = "My Real Name"
+        user.save()
+        User.objects.bulk_update([user], ["name"])
+
+        self.assertEqual([], self.calls)
+
+    def test_untracked_instances_have_no_states(self):
+        with untracked():
+            user = User.objects.get(pk=self.user.pk)
+            task = Task.objects.create(title="Hello", user=user)
+
+        message = "This User instance was created inside untracked() and has no states."
+        for method in (user.changes, user.previous_state, user.was_persisted, user.save_changed):
+            with self.subTest(method=method.__name__):
+                with self.assertRaisesMessage(AttributeError, message):
+                    method()
+        with self.assertRaisesMessage(
+            AttributeError, "Task instance was created inside untracked()"
+        ):
+            task.has_changed("title")
+
+
+class PostChangeOnCommitTestCase(TestCase):
+    def setUp(self):
+        self.calls = []
+        post_change.connect(self.receiver)
+
+    def tearDown(self):
+        post_change.disconnect(self.receiver)
+
+    def receiver(self, sender, instance, changes, **kwargs):
+        self.calls.append((instance, changes))
+
+    def test_changes_are_sent_with_signal(self):
+        user = User.objects.create(name="Foo Bar")
+        user.name = "My Real Name"
+        user.save()
+
+        self.assertEqual((user, {"name": ("Foo Bar", "My Real Name")}), self.calls[-1])
+
+    def test_sent_once_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket = Ticket(title="a")
+            ticket.save()
+            ticket.title = "b"
+            ticket.save()
+            ticket.title = "c"
+            ticket.save()
+
+            self.assertEqual([], self.calls)
+
+        self.assertEqual(
+            [(ticket, {"id": (None, ticket.pk), "title": ("a", "c")})],
+            self.calls,
+        )
+
+    def test_sent_once_across_savepoints(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket = Ticket.objects.create(title="a")
+            with transaction.atomic():
+                ticket.title = "b"
+                ticket.save()
+
+        self.assertEqual(
+            [(ticket, {"id": (None, ticket.pk), "title": ("a", "b")})],
+            self.calls,
+        )
+
+    def test_not_sent_on_rollback(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    Ticket.objects.create(title="a")
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+
+        self.assertEqual([], self.calls)
+
+
+class PostChangeOnCommitTransactionTestCase(TransactionTestCase):
+    def setUp(self):
+        self.calls = []
+        post_change.connect(self.receiver, sender=Ticket)
+
+    def tearDown(self):
+        post_change.disconnect(self.receiver, sender=Ticket)
+
+    def receiver(self, sender, instance, changes, **kwargs):
+        self.calls.append((instance, changes))
+
+    def test_sent_immediately_without_transaction(self):
+        ticket = Ticket.objects.create(title="a")
+
+        self.assertEqual([(ticket, {"id": (None, ticket.pk)})], self.calls)
+
+    def test_sent_on_commit(self):
+        with transaction.atomic():
+            ticket = Ticket.objects.create(title="a")
+            ticket.title = "b"
+            ticket.save()
+
+            self.assertEqual([], self.calls)
+
+        self.assertEqual([(ticket, {"id": (None, ticket.pk), "title": ("a", "b")})], self.calls)
+
+
+class AsyncPostChangeTestCase(TestCase):
+    def setUp(self):
+        self.calls = []
+
+    async def test_asave_sends_with_asend(self):
+        async def receiver(sender, instance, changes, **kwargs):
+            self.calls.append(changes)
+
+        post_change.connect(receiver, sender=User)
+        try:
+            user = User(name="Foo Bar")
+            await user.asave()
+            user.name = "My Real Name"
+            await user.asave()
+        finally:
+            post_change.disconnect(receiver, sender=User)
+
+        self.assertEqual(
+            [{"id": (None, user.pk)}, {"name": ("Foo Bar", "My Real Name")}],
+            self.calls,
+        )
+        self.assertNotIn("_async_post_change", user.__dict__)
+
+    async def test_adelete(self):
+        def receiver(sender, instance, changes, **kwargs):
+            self.calls.append(changes)
+
+        user = await User.objects.acreate(name="Foo Bar")
+        pk = user.pk
+        post_change.connect(receiver, sender=User)
+        try:
+            await user.adelete()
+        finally:
+            post_change.disconnect(receiver, sender=User)
+
+        self.assertEqual([{"id": (pk, None)}], self.calls)
+
+    async def test_receivers_run_concurrently(self):
+        first_started = asyncio.Event()
+        second_started = asyncio.Event()
+
+        async def first(sender, **kwargs):
+            first_started.set()
+            await asyncio.wait_for(second_started.wait(), timeout=1)
+            self.calls.append("first")
+
+        async def second(sender, **kwargs):
+            second_started.set()
+            await asyncio.wait_for(first_started.wait(), timeout=1)
+            self.calls.append("second")
+
+        post_change.connect(first, sender=User)
+        post_change.connect(second, sender=User)
+        try:
+            await User(name="Foo Bar").asave()
+        finally:
+            post_change.disconnect(first, sender=User)
+            post_change.disconnect(second, sender=User)
+
+        self.assertEqual({"first", "second"}, set(self.calls))
+
+
+class ThreadedDispatcherTestCase(TestCase):
+    def setUp(self):
+        self.events = []
+        self.threads = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def handler(self, event):
+        self.threads.append(threading.current_thread())
+        self.started.set()
+        if threading.current_thread() is not threading.main_thread():
+            self.release.wait(timeout=5)
+        self.events.append(event)
+
+    def test_events_are_handled_off_thread(self):
+        dispatcher = ThreadedDispatcher(self.handler, workers=2)
+        dispatcher.connect(sender=User)
+        self.release.set()
+        try:
+            user = User.objects.create(name="Foo Bar")
+            pk = user.pk
+            user.delete()
+            dispatcher.join()
+        finally:
+            dispatcher.disconnect(sender=User)
+            dispatcher.shutdown()
+
+        self.assertNotIn(threading.current_thread(), self.threads)
+        self.assertCountEqual(
+            [(User, pk, {"id": [None, pk]}), (User, pk, {"id": [pk, None]})],
+            [(event.model, event.pk, event.changes) for event in self.events],
+        )
+        self.assertEqual(2, dispatcher.stats()["processed"])
+        self.assertEqual(0, dispatcher.stats()["depth"])
+
+    def test_events_hold_no_instances(self):
+        me = User.objects.create(name="me")
+        you = User.objects.create(name="you")
+        article = Article.objects.create(title="a", user=me)
+        dispatcher = ThreadedDispatcher(self.handler)
+        dispatcher.connect(sender=Article)
+        self.release.set()
+        try:
+            article.user = you
+            article.save()
+            dispatcher.join()
+        finally:
+            dispatcher.disconnect(sender=Article)
+            dispatcher.shutdown()
+
+        self.assertEqual({"user_id": [me.pk, you.pk]}, self.events[0].changes)
+
+    def test_drop_oldest(self):
+        dispatcher = ThreadedDispatcher(self.handler, max_size=1, policy="drop_oldest")
+        dispatcher.connect(sender=User)
+        try:
+            first = User.objects.create(name="first")
+            self.started.wait(timeout=5)
+            User.objects.create(name="second")
+            third = User.objects.create(name="third")
+            self.release.set()
+            dispatcher.join()
+        finally:
+            dispatcher.disconnect(sender=User)
+            dispatcher.shutdown()
+
+        self.assertEqual([first.pk, third.pk], [event.pk for event in self.events])
+        self.assertEqual(1, dispatcher.stats()["dropped"])
+
+    def test_sync_when_full(self):
+        dispatcher = ThreadedDispatcher(self.handler, max_size=1, policy="sync")
+        dispatcher.connect(sender=User)
+        try:
+            User.objects.create(name="first")
+            self.started.wait(timeout=5)
+            User.objects.create(name="second")
+            User.objects.create(name="third")
+            self.release.set()
+            dispatcher.join()
+        finally:
+            dispatcher.disconnect(sender=User)
+            dispatcher.shutdown()
+
+        self.assertEqual(3, len(self.events))
+        self.assertIn(threading.current_thread(), self.threads)
+        self.assertEqual(1, dispatcher.stats()["handled_synchronously"])
+
+    def test_shutdown(self):
+        dispatcher = ThreadedDispatcher(self.handler, max_size=1)
+        dispatcher.connect(sender=User)
+        dispatcher.shutdown()
+
+        User.objects.create(name="Foo Bar")
+        self.assertEqual([], self.events)
+
+        # Would block on the full queue without workers.
+        for pk in (1, 2):
+            dispatcher.put(ChangeEvent(User, pk, {}, 0.0))
+
+        self.assertEqual([1, 2], [event.pk for event in self.events])
+        self.assertEqual(2, dispatcher.stats()["handled_synchronously"])
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            ThreadedDispatcher(self.handler, policy="retry")
+
+
+class UpperCaseField(models.CharField):
+    pass
+
+
+register_encoder(UpperCaseField, str.upper)
+
+
+class ChangePayloadTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(name="Foo")
+        self.other = User.objects.create(name="Bar")
+        self.payloads = []
+        post_change.connect(self.receiver)
+
+    def tearDown(self):
+        post_change.disconnect(self.receiver)
+
+    def receiver(self, sender, instance, payload, **kwargs):
+        self.payloads.append(payload)
+
+    def test_encoded_by_field_type(self):
+        issued = datetime.datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.UTC)
+        invoice = Invoice.objects.create(
+            user=self.user, total=decimal.Decimal("9.99"), issued=issued
+        )
+        invoice.user = self.other
+        invoice.total = decimal.Decimal("10.50")
+        invoice.issued = issued + datetime.timedelta(microseconds=1)
+        invoice.term = datetime.timedelta(days=60)
+        invoice.raw = b"\x00"
+        invoice.save()
+
+        payload = self.payloads[-1]
+        self.assertEqual(str(invoice.pk), payload.pk)
+        self.assertEqual(
+            {
+                "user_id": [self.user.pk, self.other.pk],
+                "total": ["9.99", "10.50"],
+                "issued": ["2024-01-02T03:04:05.678901+00:00", "2024-01-02T03:04:05.678902+00:00"],
+                "term": ["P30DT00H00M00S", "P60DT00H00M00S"],
+                "raw": ["", "AA=="],
+            },
+            payload.changes,
+        )
+        self.assertEqual(
+            {"model": "tests.Invoice", "pk": str(invoice.pk), "changes": payload.changes},
+            json.loads(payload.json),
+        )
+
+    def test_shared_by_receivers(self):
+        payloads = []
+
+        def other_receiver(sender, payload, **kwargs):
+            payloads.append(payload)
+
+        post_change.connect(other_receiver, sender=User)
+        try:
+            self.user.name = "Baz"
+            self.user.save()
+        finally:
+            post_change.disconnect(other_receiver, sender=User)
+
+        self.assertIs(self.payloads[-1], payloads[0])
+        self.assertIs(payloads[0].json, self.payloads[-1].json)
+
+    def test_deleted(self):
+        pk = self.user.pk
+        self.user.delete()
+
+        self.assertEqual(pk, self.payloads[-1].pk)
+        self.assertEqual({"id": [pk, None]}, self.payloads[-1].changes)
+
+    def test_digest_fields(self):
+        document = Document.objects.create(title="a", body="x")
+        document.body = "y"
+        document.save()
+
+        self.assertEqual({"body": [None, None]}, self.payloads[-1].changes)
+
+    def test_bulk(self):
+        received = []
+
+        def receiver(sender, payloads, **kwargs):
+            received.extend(payloads)
+
+        post_change_bulk.connect(receiver, sender=User)
+        try:
+            self.user.name = "Baz"
+            User.objects.bulk_update([self.user], ["name"])
+        finally:
+            post_change_bulk.disconnect(receiver, sender=User)
+
+        self.assertEqual({"name": ["Foo", "Baz"]}, received[0].changes)
+
+    @isolate_apps("tests")
+    def test_registered_encoder(self):
+        class Tag(ChangesMixin, models.Model):
+            name = UpperCaseField(max_length=100)
+
+        tag = Tag(name="django")
+        tag.name = "Django"
+
+        self.assertEqual({"name": ["DJANGO", "DJANGO"]}, ChangePayload(tag, tag.changes()).changes)
+
+
+class ChangeLogRecorderTestCase(TestCase):
+    def setUp(self):
+        self.recorder = ChangeLogRecorder()
+        self.recorder.connect(sender=Post)
+        self.user = User.objects.create(name="Foo Bar")
+
+    def tearDown(self):
+        self.recorder.disconnect(sender=Post)
+
+    def test_one_insert_per_transaction(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            post = Post.objects.create(title="a", user=self.user)
+            post_pk = post.pk
+            post.title = "b"
+            post.save()
+            post.delete()
+
+        self.assertEqual(0, ChangeLog.objects.count())
+        with self.assertNumQueries(1):
+            for callback in callbacks:
+                callback()
+
+        self.assertEqual(
+            [
+                (ChangeLog.CREATE, {"id": [None, post_pk]}),
+                (ChangeLog.UPDATE, {"title": ["a", "b"]}),
+                (ChangeLog.DELETE, {"id": [post_pk, None]}),
+            ],
+            [(log.action, log.changes) for log in ChangeLog.objects.order_by("pk")],
+        )
+
+    def test_one_insert_without_savepoints(self):
+        with mock.patch.object(self.recorder, "write", wraps=self.recorder.write) as write:
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic(savepoint=False):
+                    for title in "abc":
+                        Post.objects.create(title=title, user=self.user)
+
+        self.assertEqual(1, write.call_count)
+        self.assertEqual(3, ChangeLog.objects.count())
+
+    def test_action_of_changes_on_commit(self):
+        # Saved without post_change_on_commit buffering the change.
+        Ticket.objects.bulk_create([Ticket(title="a")])
+        deleted = Ticket.objects.get()
+        deleted_pk = deleted.pk
+        self.recorder.connect(sender=Ticket)
+        try:
+            with self.captureOnCommitCallbacks(execute=True):
+                created = Ticket.objects.create(title="a")
+                created.title = "b"
+                created.save()
+                Ticket.objects.create(title="c").delete()
+                deleted.title = "b"
+                deleted.save()
+                deleted.delete()
+        finally:
+            self.recorder.disconnect(sender=Ticket)
+
+        self.assertEqual(
+            [
+                (ChangeLog.CREATE, {"id": [None, created.pk], "title": ["a", "b"]}),
+                (ChangeLog.DELETE, {"id": [deleted_pk, None], "title": ["a", "b"]}),
+            ],
+            [(log.action, log.changes) for log in ChangeLog.objects.order_by("pk")],
+        )
+
+    def test_discarded_on_rollback(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.create(title="a", user=self.user)
+            try:
+                with transaction.atomic():
+                    Post.objects.create(title="b", user=self.user)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+
+        self.assertEqual(1, ChangeLog.objects.count())
+
+    def test_buffer(self):
+        with buffer_change_logs():
+            with self.captureOnCommitCallbacks(execute=True):
+                post = Post.objects.create(title="a", user=self.user)
+
+            self.assertEqual(0, ChangeLog.objects.count())
+
+        log = ChangeLog.objects.get()
+        self.assertEqual(
+            (ChangeLog.CREATE, "tests.Post", str(post.pk)), (log.action, log.model, log.object_pk)
+        )
+
+    def test_for_object(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            post = Post.objects.create(title="a", user=self.user)
+            Post.objects.create(title="b", user=self.user)
+            post.title = "c"
+            post.save()
+
+        self.assertEqual(
+            [ChangeLog.CREATE, ChangeLog.UPDATE],
+            [log.action for log in ChangeLog.objects.for_object(post)],
+        )
+
+
+class CacheInvalidatorTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(name="Foo")
+        self.invalidator = CacheInvalidator()
+        self.invalidator.register(User, "user:{pk}", fields=["name"])
+        self.invalidator.register(User, "user:name:{name}", fields=())
+        cache.set_many({f"user:{self.user.pk}": 1, "user:name:Foo": 2, "user:name:Bar": 3})
+
+    def tearDown(self):
+        self.invalidator.unregister(User)
+        cache.clear()
+
+    def cached(self):
+        return set(cache.get_many([f"user:{self.user.pk}", "user:name:Foo", "user:name:Bar"]))
+
+    def test_untracked_placeholders(self):
+        with self.assertRaisesMessage(ValueError, "not tracked: bio"):
+            self.invalidator.register(Profile, "profile:{bio}")
+        with self.assertRaisesMessage(ValueError, "not tracked: user"):
+            self.invalidator.register(Comment, "comments:{user}")
+        self.invalidator.register(Comment, "comments:{user_id}")
+        self.invalidator.unregister(Comment)
+
+    def test_digest_placeholders(self):
+        with self.assertRaisesMessage(ValueError, "only record digests: body"):
+            self.invalidator.register(Document, "doc:{body}")
+
+        # Digest fields can still be dependencies of a key.
+        document = Document.objects.create(title="a", body="old")
+        self.invalidator.register(Document, "doc:{pk}", fields=["body"])
+        try:
+            cache.set(f"doc:{document.pk}", 1)
+            with self.captureOnCommitCallbacks(execute=True):
+                document.body = "new"
+                document.save()
+        finally:
+            self.invalidator.unregister(Document)
+
+        self.assertIsNone(cache.get(f"doc:{document.pk}"))
+
+    def test_unrelated_change(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.flag = True
+            self.user.save()
+
+        self.assertEqual(3, len(self.cached()))
+
+    def test_dependency_changed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.name = "Bar"
+            self.user.save()
+
+        self.assertEqual(set(), self.cached())
+
+    def test_deleted(self):
+        pk = self.user.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+
+        self.assertEqual({"user:name:Bar"}, self.cached())
+        self.assertNotIn(f"user:{pk}", cache)
+
+    def test_one_delete_many_per_transaction(self):
+        with mock.patch.object(cache, "delete_many", wraps=cache.delete_many) as delete_many:
+            with self.captureOnCommitCallbacks() as callbacks:
+                self.user.name = "Bar"
+                self.user.save()
+                self.user.name = "Foo"
+                self.user.save()
+
+            self.assertEqual(3, len(self.cached()))
+            for callback in callbacks:
+                callback()
+
+        delete_many.assert_called_once()
+        self.assertEqual(set(), self.cached())
+
+    def test_bulk_update(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.filter(pk=self.user.pk).update(name="Bar")
+
+        self.assertEqual(set(), self.cached())
+
+
+def stats_receiver(sender, instance, **kwargs):
+    pass
+
+
+class InstrumentationTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(name="Foo Bar")
+        self.article = Article.objects.create(title="a", user=self.user)
+        self.collector = StatsCollector()
+
+    def test_snapshots_and_queries(self):
+        with instrument(self.collector):
+            article = Article.objects.get(pk=self.article.pk)
+
+        stats = self.collector.stats()
+        # The article and its related user, read with one query.
+        self.assertEqual(2, stats["snapshots"])
+        self.assertEqual(1, stats["snapshot_queries"])
+        self.assertGreater(stats["snapshot_time"], 0)
+
+        article.title = "b"
+        article.changes()
+        self.assertEqual(2, self.collector.stats()["snapshots"])
+
+    def test_diff(self):
+        with instrument(self.collector):
+            self.user.name = "My Real Name"
+            self.user.changes()
+
+        stats = self.collector.stats()
+        self.assertEqual(1, stats["diffs"])
+        self.assertEqual(len(self.user.previous_state()), stats["fields_compared"])
+
+    def test_dispatch(self):
+        post_change.connect(stats_receiver, sender=User)
+        try:
+            with instrument(self.collector):
+                self.user.save()
+        finally:
+            post_change.disconnect(stats_receiver, sender=User)
+
+        self.assertEqual({"tests.tests.stats_receiver": 1}, self.collector.stats()["dispatches"])
+
+    def test_diff_against_db(self):
+        with instrument(self.collector):
+            self.user.changes()
+            changed_against_db([self.user])
+
+        self.assertEqual(2, self.collector.stats()["diffs"])
+
+    def test_lazy_snapshot_queries(self):
+        LazyTask.objects.create(title="a", user=self.user)
+        task = LazyTask.objects.get()
+
+        with instrument(self.collector):
+            task.previous_state()
+
+        stats = self.collector.stats()
+        # The task and its related user, read when the pending snapshot is
+        # taken.
+        self.assertEqual(2, stats["snapshots"])
+        self.assertEqual(1, stats["snapshot_queries"])
+
+    def test_async_receivers_run_concurrently(self):
+        first_started = asyncio.Event()
+        second_started = asyncio.Event()
+
+        async def first(sender, **kwargs):
+            first_started.set()
+            await asyncio.wait_for(second_started.wait(), timeout=1)
+
+        async def second(sender, **kwargs):
+            second_started.set()
+            await asyncio.wait_for(first_started.wait(), timeout=1)
+
+        post_change.connect(first, sender=User)
+        post_change.connect(second, sender=User)
+        try:
+            with instrument(self.collector):
+                self.user.save()
+        finally:
+            post_change.disconnect(first, sender=User)
+            post_change.disconnect(second, sender=User)
+
+        self.assertEqual(2, sum(self.collector.stats()["dispatches"].values()))
+
+    async def test_asave(self):
+        post_change.connect(stats_receiver, sender=User)
+        try:
+            with instrument(self.collector):
+                await self.user.asave()
+        finally:
+            post_change.disconnect(stats_receiver, sender=User)
+
+        self.assertEqual({"tests.tests.stats_receiver": 1}, self.collector.stats()["dispatches"])